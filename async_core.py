@@ -0,0 +1,138 @@
+import asyncio
+import itertools
+
+from scheduler import DONE, FAILED, CANCELLED as JOB_CANCELLED
+from event_bus import QUEUED, STARTED, INFO, SKIPPED, SELECTING, ERROR, CANCELLED
+
+STOPPED = "Stopped by user"
+
+
+class AsyncDownloader:
+    """
+    asyncio front end of VideoDownloader.
+
+    Blocking yt-dlp work runs on the DownloadScheduler's workers, with the
+    same concurrency and per-host limits as the GUI; a coroutine only
+    awaits the result. A job waiting for its slot or for a user decision
+    (playlist selection) is a parked coroutine holding no thread, so
+    thousands of them cost a few KB each. Lifecycle and progress go to
+    downloader.events; consume them with events.stream().
+    """
+
+    def __init__(self, downloader):
+        self.downloader = downloader
+        self.events = downloader.events
+        self._keys = itertools.count(1)
+        self._cancelled = set()
+
+    async def run(self, func, *args, url=None, priority=0, prefetch=False, **kwargs):
+        """Runs func(*args, **kwargs) on a scheduler worker and returns its result (or raises its exception)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def on_state(job):
+            if job.state in (DONE, FAILED, JOB_CANCELLED):
+                loop.call_soon_threadsafe(self._settle, future, job)
+
+        job = self.downloader.scheduler.submit(func, *args, url=url, priority=priority, on_state=on_state,
+                                               prefetch=prefetch, **kwargs)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Only possible while queued; a running job stops through cancel(key)
+            self.downloader.scheduler.cancel(job)
+            raise
+
+    @staticmethod
+    def _settle(future, job):
+        if future.done():
+            return
+        if job.state == DONE:
+            future.set_result(job.result)
+        elif job.state == FAILED:
+            future.set_exception(job.error)
+        else:
+            future.cancel()
+
+    def cancel(self, key):
+        """Stops a job: dropped from the queue, or its download aborted at the next progress tick."""
+        self._cancelled.add(key)
+
+    def cancel_all(self):
+        self._cancelled.add(None)
+
+    def is_cancelled(self, key):
+        return key in self._cancelled or None in self._cancelled
+
+    async def download(self, url, output_path, key=None, select=None, use_cache=True, **options):
+        """
+        One link end to end: archive check, extraction, playlist selection, download.
+        select: async callable(info) returning the playlist_items string, or
+                None to cancel. It is awaited on the event loop, no thread
+                waits for the user. Without it the whole playlist (or
+                options['playlist_items']) is downloaded.
+        options: passed on to VideoDownloader.download_video.
+        Returns (success, message); the outcome is also published as an event.
+        """
+        key = next(self._keys) if key is None else key
+        self.events.publish(QUEUED, key, url=url)
+        ask = select is not None and not options.get('playlist_items')
+        try:
+            # Extraction and, when nothing has to be asked, the download in one slot
+            result = await self.run(self._prepare, key, url, output_path, use_cache, ask, options, url=url, prefetch=True)
+            if result[0] != 'select':
+                return result
+            info = result[1]
+            self.events.publish(SELECTING, key, url=url, entries=len(info.get('entries') or []))
+            items = await select(info)
+            if not items:
+                self.events.publish(CANCELLED, key, url=url)
+                return False, "Cancelled"
+            options = dict(options, playlist_items=items)
+            # Already waited once in the queue, so run ahead of new links
+            return await self.run(self._download, key, url, output_path, info, options, url=url, priority=1)
+        except asyncio.CancelledError:
+            self.events.publish(CANCELLED, key, url=url)
+            raise
+        except Exception as e:
+            self.events.publish(ERROR, key, url=url, message=str(e))
+            return False, str(e)
+        finally:
+            self._cancelled.discard(key)
+
+    def _prepare(self, key, url, output_path, use_cache, ask, options):
+        # Scheduler worker
+        if self.is_cancelled(key):
+            self.events.publish(CANCELLED, key, url=url)
+            return False, STOPPED
+        self.events.publish(STARTED, key, url=url)
+        archived = self.downloader.find_archived(url)
+        if archived:
+            self.events.publish(SKIPPED, key, url=url, path=archived['path'], archive_id=archived['archive_id'])
+            return True, "Already downloaded"
+        info = self.downloader.get_video_info(url, use_cache=use_cache)
+        if 'error' in info:
+            self.events.publish(ERROR, key, url=url, message=info['error'])
+            return False, info['error']
+        is_playlist = self.downloader._is_playlist(info)
+        self.events.publish(INFO, key, url=url, title=info.get('title'), extractor=info.get('extractor_key'),
+                            playlist=is_playlist, entries=len(info.get('entries') or []) if is_playlist else None)
+        if is_playlist and ask:
+            return 'select', info
+        return self._download(key, url, output_path, info, options)
+
+    def _download(self, key, url, output_path, info, options):
+        # Scheduler worker
+        options = dict(options)
+        progress_hook = options.pop('progress_hook', None)
+
+        def hook(d):
+            if self.is_cancelled(key):
+                raise Exception(STOPPED)
+            if progress_hook:
+                progress_hook(d)
+
+        is_playlist = self.downloader._is_playlist(info)
+        options.setdefault('playlist_name', info.get('title') if is_playlist else None)
+        return self.downloader.download_video(url, output_path, info=info, progress_hook=hook, event_key=key,
+                                              is_cancelled=lambda: self.is_cancelled(key), **options)
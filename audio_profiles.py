@@ -0,0 +1,43 @@
+"""
+Audio-mode profiles: which source stream to pick and what FFmpegExtractAudio
+does with it. Profiles whose codec matches the source (m4a from AAC, opus
+from Opus, 'original') are a stream copy, no re-encode.
+"""
+
+# quality: kbps for CBR, '0'-'9' for VBR (lower is better), None for copy
+AUDIO_PROFILES = {
+    'mp3-192': {'label': 'MP3 192 kbps', 'codec': 'mp3', 'quality': '192',
+                'format': 'bestaudio[acodec=mp3]/bestaudio/best'},
+    'mp3-320': {'label': 'MP3 320 kbps', 'codec': 'mp3', 'quality': '320',
+                'format': 'bestaudio[acodec=mp3]/bestaudio/best'},
+    'mp3-vbr': {'label': 'MP3 VBR (V2)', 'codec': 'mp3', 'quality': '2',
+                'format': 'bestaudio[acodec=mp3]/bestaudio/best'},
+    'm4a': {'label': 'M4A (AAC, copy)', 'codec': 'm4a', 'quality': None,
+            'format': 'bestaudio[ext=m4a]/bestaudio[acodec^=mp4a]/bestaudio/best'},
+    'opus': {'label': 'Opus (copy)', 'codec': 'opus', 'quality': None,
+             'format': 'bestaudio[acodec=opus]/bestaudio/best'},
+    'original': {'label': 'Original (no conversion)', 'codec': 'best', 'quality': None,
+                 'format': 'bestaudio/best'},
+}
+DEFAULT_PROFILE = 'mp3-192'
+
+
+def build_audio_opts(name=DEFAULT_PROFILE, bitrate=None, threads=0):
+    """
+    yt-dlp options for an audio profile.
+    bitrate: overrides the profile's quality (kbps, or VBR level 0-9)
+    threads: ffmpeg encoder threads, 0 leaves ffmpeg's default
+    """
+    profile = AUDIO_PROFILES.get(name) or AUDIO_PROFILES[DEFAULT_PROFILE]
+    pp_def = {'key': 'FFmpegExtractAudio', 'preferredcodec': profile['codec']}
+    quality = str(bitrate) if bitrate else profile['quality']
+    if quality:
+        pp_def['preferredquality'] = quality
+    opts = {
+        'format': profile['format'],
+        # Converted on the post-processing pool, see VideoDownloader._finish_postprocess
+        'deferred_postprocessors': [pp_def],
+    }
+    if threads:
+        opts['postprocessor_args'] = {'extractaudio': ['-threads', str(int(threads))]}
+    return opts
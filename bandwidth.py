@@ -0,0 +1,238 @@
+import threading
+import time
+
+# How often the time-of-day schedule is re-checked while downloads run
+SCHEDULE_CHECK_SECONDS = 30
+# Longest single sleep in a progress hook, so limit changes apply quickly
+MAX_SLEEP = 1.0
+
+
+def parse_rate(text):
+    """'500K', '2M', '1.5m', '800000' -> bytes/s. Empty/0 -> None (unlimited)."""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        return int(text) or None
+    text = str(text).strip().upper().rstrip('B/S')
+    multiplier = 1
+    if text and text[-1] in 'KMG':
+        multiplier = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}[text[-1]]
+        text = text[:-1]
+    try:
+        value = int(float(text) * multiplier)
+    except ValueError:
+        raise ValueError(f"Invalid rate: {text!r}")
+    return value or None
+
+
+def _minutes(hhmm):
+    hours, _, minutes = hhmm.partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def scheduled_limit(schedule, now=None):
+    """
+    Limit in bytes/s from a schedule, None when no rule applies.
+    schedule: [{"start": "09:00", "end": "18:00", "limit_kbps": 2000, "days": [0, 1, 2, 3, 4]}]
+    (days: 0 = Monday, optional; a rule may wrap past midnight, e.g. 22:00-06:00).
+    """
+    now = now or time.localtime()
+    minute = now.tm_hour * 60 + now.tm_min
+    for rule in schedule or []:
+        try:
+            start, end = _minutes(rule['start']), _minutes(rule['end'])
+        except (KeyError, ValueError):
+            continue
+        days = rule.get('days')
+        if days is not None and now.tm_wday not in days:
+            continue
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            return int(rule.get('limit_kbps') or 0) * 1024 or None
+    return None
+
+
+class TokenBucket:
+    """Bytes/s limiter. consume() returns how long the caller should sleep."""
+
+    def __init__(self, rate=None, burst_seconds=1.0):
+        self.rate = rate
+        self.burst_seconds = burst_seconds
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = rate
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.rate * self.burst_seconds, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, amount):
+        with self._lock:
+            if not self.rate:
+                return 0
+            self._refill()
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+
+class BandwidthLease:
+    """
+    Bandwidth given to one download job. Add progress_hook to its yt-dlp
+    hooks and bind() it to the YoutubeDL params: bytes are charged to the
+    job's bucket (its fair share) and to the shared global bucket, and the
+    download thread sleeps off any debt.
+    """
+
+    def __init__(self, manager, cap=None, default_cap=False):
+        self.manager = manager
+        self.cap = cap  # per-task limit, None = only the global one
+        self.default_cap = default_cap  # cap is the manager's per_task_limit, not the job's own
+        self.share = None
+        self.bucket = TokenBucket()
+        self.params = None
+        self._file_bytes = {}
+        self._lock = threading.Lock()
+
+    def bind(self, params):
+        with self._lock:
+            self.params = params
+            self._apply()
+
+    def unbind(self):
+        """Stops writing to the params (call before the YoutubeDL is released)."""
+        with self._lock:
+            self.params = None
+
+    def set_share(self, share):
+        self.share = share
+        self.bucket.set_rate(share)
+        with self._lock:
+            self._apply()
+
+    def _apply(self):
+        # Called with the lock held.
+        # yt-dlp's own limiter smooths each transfer; the buckets enforce the totals
+        if self.params is not None:
+            if self.share:
+                self.params['ratelimit'] = self.share
+            else:
+                self.params.pop('ratelimit', None)
+
+    def progress_hook(self, d):
+        if d.get('status') != 'downloading':
+            return
+        filename = d.get('filename')
+        done = d.get('downloaded_bytes') or 0
+        with self._lock:
+            delta = done - self._file_bytes.get(filename, 0)
+            self._file_bytes[filename] = done
+        if delta <= 0:
+            return
+        wait = max(self.bucket.consume(delta), self.manager.charge(delta))
+        if wait > 0:
+            time.sleep(min(wait, MAX_SLEEP))
+
+
+class BandwidthManager:
+    """
+    Global and per-task bandwidth limits shared by every running download.
+
+    The global limit (or the one of the active schedule rule) is split with
+    max-min fairness: tasks capped below an equal share keep their cap and
+    the rest is divided evenly among the others, so a large download cannot
+    starve small ones. Limits can be changed live; shares are recomputed
+    whenever a download starts or ends and when a schedule rule changes.
+    """
+
+    def __init__(self, global_limit=None, per_task_limit=None, schedule=None):
+        self.global_limit = global_limit
+        self.per_task_limit = per_task_limit
+        self.schedule = schedule or []
+        self.bucket = TokenBucket()
+        self._leases = []
+        self._lock = threading.Lock()
+        self._effective = None
+        self._checked = 0
+
+    def effective_limit(self):
+        scheduled = scheduled_limit(self.schedule)
+        return scheduled if scheduled is not None else self.global_limit
+
+    def acquire(self, cap=None):
+        lease = BandwidthLease(self, cap or self.per_task_limit, default_cap=not cap)
+        with self._lock:
+            self._leases.append(lease)
+        self.rebalance()
+        return lease
+
+    def release(self, lease):
+        with self._lock:
+            if lease in self._leases:
+                self._leases.remove(lease)
+        self.rebalance()
+
+    def charge(self, amount):
+        now = time.monotonic()
+        if now - self._checked > SCHEDULE_CHECK_SECONDS:
+            self._checked = now
+            if self.effective_limit() != self._effective:
+                self.rebalance()
+        return self.bucket.consume(amount)
+
+    def set_limits(self, global_limit=False, per_task_limit=False, schedule=None):
+        """False leaves a setting unchanged, None removes the limit."""
+        with self._lock:
+            if global_limit is not False:
+                self.global_limit = global_limit
+            if per_task_limit is not False:
+                self.per_task_limit = per_task_limit
+                for lease in self._leases:
+                    # Jobs given their own rate (e.g. --task-rate) keep it
+                    if lease.default_cap:
+                        lease.cap = per_task_limit
+            if schedule is not None:
+                self.schedule = schedule
+        self.rebalance()
+
+    def rebalance(self):
+        limit = self.effective_limit()
+        with self._lock:
+            self._effective = limit
+            leases = list(self._leases)
+        self.bucket.set_rate(limit)
+        for lease, share in zip(leases, self.fair_shares(limit, [lease.cap for lease in leases])):
+            lease.set_share(share)
+
+    @staticmethod
+    def fair_shares(limit, caps):
+        """Max-min fair split of limit; caps are per-task limits (None = no cap)."""
+        shares = [cap for cap in caps]
+        if not limit:
+            return shares
+        remaining = limit
+        open_tasks = list(range(len(caps)))
+        # Hand out capped tasks whose cap is under the equal share first
+        while open_tasks:
+            equal = remaining / len(open_tasks)
+            capped = [i for i in open_tasks if caps[i] and caps[i] <= equal]
+            if not capped:
+                for i in open_tasks:
+                    shares[i] = int(equal)
+                break
+            for i in capped:
+                shares[i] = caps[i]
+                remaining -= caps[i]
+                open_tasks.remove(i)
+        return shares
+
+    def stats(self):
+        with self._lock:
+            return {'limit': self._effective, 'active': len(self._leases),
+                    'shares': [lease.share for lease in self._leases]}
@@ -0,0 +1,499 @@
+"""
+Download benchmark: VideoDownloader against a local fixture server, no internet needed.
+
+    python benchmarks/download_bench.py                       # every scenario, 4 jobs each
+    python benchmarks/download_bench.py --scenario hls --jobs 16
+    python benchmarks/download_bench.py --server-rate 5M --latency 50
+
+The server serves a progressive mp4, an HLS and a DASH rendition of the same
+clip (made with ffmpeg; without ffmpeg only synthetic progressive/HLS bytes)
+and HTML pages with <video> tags as playlists, all through yt-dlp's generic
+extractor. Each scenario runs in a fresh process with its own data files and
+reports throughput, time to first byte, per-job overhead, peak memory and the
+progress event rate the GUI would see.
+
+Results are appended to benchmarks/results/downloads.jsonl so releases can be compared.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results", "downloads.jsonl")
+SCENARIOS = ("progressive", "hls", "dash", "playlist")
+CONTENT_TYPES = {
+    ".mp4": "video/mp4", ".m4s": "video/iso.segment", ".ts": "video/mp2t",
+    ".m3u8": "application/vnd.apple.mpegurl", ".mpd": "application/dash+xml",
+    ".html": "text/html; charset=utf-8",
+}
+# Same cadence as gui.PROGRESS_REFRESH_MS: rows are repainted at most this often
+REPAINT_INTERVAL = 0.1
+CHUNK = 64 * 1024
+
+
+def read_version():
+    try:
+        with open(os.path.join(ROOT, "version.json"), encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except Exception:
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on Linux, bytes on macOS
+        return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+    except ImportError:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+        return round(counters.PeakWorkingSetSize / 1024 / 1024, 1)
+
+
+# --- Fixtures ---
+
+def make_fixtures(directory, duration, size_mb):
+    """
+    progressive.mp4, hls/ and dash/ in directory (reused between runs).
+    Returns the scenarios the fixtures support.
+    """
+    marker = os.path.join(directory, "fixtures.json")
+    if os.path.exists(marker):
+        with open(marker, encoding="utf-8") as f:
+            return json.load(f)["scenarios"]
+    os.makedirs(os.path.join(directory, "hls"), exist_ok=True)
+    os.makedirs(os.path.join(directory, "dash"), exist_ok=True)
+    if shutil.which("ffmpeg"):
+        _ffmpeg_fixtures(directory, duration)
+        scenarios = list(SCENARIOS)
+    else:
+        # Random bytes: yt-dlp downloads them fine, but nothing can be merged
+        print("ffmpeg not found: synthetic fixtures, no DASH scenario", file=sys.stderr)
+        _synthetic_fixtures(directory, size_mb)
+        scenarios = ["progressive", "hls", "playlist"]
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump({"scenarios": scenarios, "duration": duration}, f)
+    return scenarios
+
+
+def _ffmpeg_fixtures(directory, duration):
+    def ffmpeg(*args, cwd=directory):
+        subprocess.run(["ffmpeg", "-v", "error", "-y", *args], cwd=cwd, check=True)
+
+    # Built-in encoders only (mpeg4 + aac), so any ffmpeg build works
+    ffmpeg("-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=30:duration={duration}",
+           "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+           "-c:v", "mpeg4", "-b:v", "4M", "-c:a", "aac", "-b:a", "128k", "-movflags", "+faststart",
+           "progressive.mp4")
+    ffmpeg("-i", os.path.join("..", "progressive.mp4"), "-c", "copy", "-f", "hls", "-hls_time", "2",
+           "-hls_playlist_type", "vod", "-hls_segment_filename", "seg%03d.ts", "index.m3u8",
+           cwd=os.path.join(directory, "hls"))
+    # Separate video and audio representations: exercises the merge path
+    ffmpeg("-i", os.path.join("..", "progressive.mp4"), "-map", "0:v", "-map", "0:a", "-c", "copy",
+           "-f", "dash", "-seg_duration", "2", "-use_template", "1", "-use_timeline", "0", "manifest.mpd",
+           cwd=os.path.join(directory, "dash"))
+
+
+def _synthetic_fixtures(directory, size_mb):
+    with open(os.path.join(directory, "progressive.mp4"), "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+    segments = max(1, size_mb)
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:2", "#EXT-X-PLAYLIST-TYPE:VOD"]
+    for i in range(segments):
+        with open(os.path.join(directory, "hls", f"seg{i:03d}.ts"), "wb") as f:
+            f.write(os.urandom(1024 * 1024))
+        lines += ["#EXTINF:2.0,", f"seg{i:03d}.ts"]
+    lines.append("#EXT-X-ENDLIST")
+    with open(os.path.join(directory, "hls", "index.m3u8"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# --- Server ---
+
+class FixtureServer:
+    """
+    Serves the fixtures under per-job URLs, so every job is a distinct video:
+      /progressive/<name>.mp4     /hls/<name>/index.m3u8     /dash/<name>/manifest.mpd
+      /playlist/<name>.html       (<video> tags pointing at /progressive/<name>-<n>.mp4)
+    rate: bytes/s per connection (None = unthrottled), latency: seconds before each response.
+    """
+
+    def __init__(self, fixtures, rate=None, latency=0.0, playlist_size=5):
+        self.fixtures = fixtures
+        self.rate = rate
+        self.latency = latency
+        self.playlist_size = playlist_size
+        self.requests = itertools.count()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def url(self, scenario, name):
+        return {
+            "progressive": f"{self.base_url}/progressive/{name}.mp4",
+            "hls": f"{self.base_url}/hls/{name}/index.m3u8",
+            "dash": f"{self.base_url}/dash/{name}/manifest.mpd",
+            "playlist": f"{self.base_url}/playlist/{name}.html",
+        }[scenario]
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def resolve(self, path):
+        """Request path -> (file path or None, generated body or None)."""
+        parts = path.split("?")[0].strip("/").split("/")
+        if parts[0] == "progressive" and len(parts) == 2:
+            return os.path.join(self.fixtures, "progressive.mp4"), None
+        if parts[0] in ("hls", "dash") and len(parts) == 3 and ".." not in parts[2]:
+            return os.path.join(self.fixtures, parts[0], parts[2]), None
+        if parts[0] == "playlist" and len(parts) == 2:
+            name = parts[1].rsplit(".", 1)[0]
+            videos = "\n".join(f'<video controls src="/progressive/{name}-{n}.mp4"></video>'
+                               for n in range(1, self.playlist_size + 1))
+            body = f"<!DOCTYPE html><html><head><title>{name}</title></head><body>\n{videos}\n</body></html>"
+            return None, body.encode("utf-8")
+        return None, None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+            def do_GET(self):
+                self._serve(send_body=True)
+
+            def _serve(self, send_body):
+                next(server.requests)
+                if server.latency:
+                    time.sleep(server.latency)
+                path, body = server.resolve(self.path)
+                if path and os.path.exists(path):
+                    size = os.path.getsize(path)
+                elif body is not None:
+                    size = len(body)
+                else:
+                    self.send_error(404)
+                    return
+                start, end = 0, size - 1
+                match = re.match(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+                if match and (match.group(1) or match.group(2)):
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)), size - 1) if match.group(2) else end
+                    else:
+                        start = max(0, size - int(match.group(2)))
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                else:
+                    self.send_response(200)
+                ext = os.path.splitext(self.path.split("?")[0])[1]
+                self.send_header("Content-Type", CONTENT_TYPES.get(ext, "application/octet-stream"))
+                self.send_header("Content-Length", str(end - start + 1))
+                self.send_header("Accept-Ranges", "bytes")
+                self.end_headers()
+                if not send_body:
+                    return
+                try:
+                    if body is not None:
+                        self.wfile.write(body[start:end + 1])
+                    else:
+                        self._send_file(path, start, end - start + 1)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send_file(self, path, offset, remaining):
+                started = time.monotonic()
+                sent = 0
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    while remaining > 0:
+                        data = f.read(min(CHUNK, remaining))
+                        if not data:
+                            break
+                        self.wfile.write(data)
+                        remaining -= len(data)
+                        sent += len(data)
+                        if server.rate:
+                            ahead = sent / server.rate - (time.monotonic() - started)
+                            if ahead > 0:
+                                time.sleep(ahead)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+# --- Worker (one scenario, own process) ---
+
+class BenchConfig:
+    """Stand-in for ConfigManager: fixed values, nothing saved."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_scenario(urls, workers):
+    """Downloads urls the way the CLI does; runs in the worker process."""
+    sys.path.insert(0, ROOT)
+    from downloader import VideoDownloader
+    from task_model import TaskRecord
+
+    # Everything local: one "host", so the per-host limit must not be the bottleneck
+    downloader = VideoDownloader(BenchConfig({
+        "max_concurrent_downloads": workers,
+        "max_downloads_per_host": workers,
+        "metadata_cache": False,
+    }))
+    metrics = []
+    downloader.telemetry.add_listener(metrics.append)
+    output = os.path.abspath("downloads")
+    events = itertools.count()
+    records = [TaskRecord(None, title=url) for url in urls]
+    errors = []
+
+    def job(url, record):
+        info = downloader.get_video_info(url, use_cache=False)
+        if 'error' in info:
+            errors.append(info['error'])
+            return False
+        is_playlist = info.get('_type') == 'playlist' or 'entries' in info
+
+        def progress_hook(d):
+            next(events)
+            if d.get('status') == 'downloading':
+                total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                percent = d.get('downloaded_bytes', 0) / total if total else 0
+                record.publish((percent, f"{percent:.1%}", f"{(d.get('speed') or 0) / 1024 / 1024:.1f} MB/s", None))
+
+        success, msg = downloader.download_video(url, output, progress_hook=progress_hook, info=info,
+                                                 playlist_name=info.get('title') if is_playlist else None)
+        if not success:
+            errors.append(msg)
+        return success
+
+    # Rows the GUI timer would repaint: one per record whose version changed since the last tick
+    painted = {}
+    paints = itertools.count()
+    done = threading.Event()
+
+    def repaint_sampler():
+        while not done.wait(REPAINT_INTERVAL):
+            for record in records:
+                if painted.get(id(record)) != record.version:
+                    painted[id(record)] = record.version
+                    next(paints)
+
+    sampler = threading.Thread(target=repaint_sampler, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    jobs = [downloader.scheduler.submit(job, url, record, url=url, prefetch=True) for url, record in zip(urls, records)]
+    for scheduled in jobs:
+        scheduled.wait()
+    wall = time.perf_counter() - started
+    done.set()
+    sampler.join()
+    downloader.scheduler.shutdown()
+
+    total_bytes = sum(m['bytes'] for m in metrics)
+    ttfb = [m['time_to_first_byte'] for m in metrics if m['time_to_first_byte'] is not None]
+    # Extraction plus everything in download_video that is not transferring (queue wait excluded)
+    overhead = [m['stages'].get('extract', 0) + m['duration'] - m['stages'].get('transfer', 0) for m in metrics]
+    stage_names = sorted({stage for m in metrics for stage in m['stages']})
+    return {
+        "jobs": len(urls),
+        "succeeded": sum(1 for scheduled in jobs if scheduled.result),
+        "errors": errors[:3],
+        "wall_s": round(wall, 3),
+        "bytes": total_bytes,
+        "throughput_mb_s": round(total_bytes / wall / 1024 / 1024, 2) if wall else None,
+        "ttfb_median_s": percentile(ttfb, 0.5),
+        "ttfb_p95_s": percentile(ttfb, 0.95),
+        "per_job_overhead_s": round(sum(overhead) / len(overhead), 3) if overhead else None,
+        "stages_mean_s": {stage: round(sum(m['stages'].get(stage, 0) for m in metrics) / len(metrics), 3)
+                          for stage in stage_names} if metrics else {},
+        "retries": sum(m['retries'] for m in metrics),
+        "peak_rss_mb": peak_rss_mb(),
+        "progress_events_per_s": round(next(events) / wall, 1) if wall else None,
+        "tk_row_paints_per_s": round(next(paints) / wall, 1) if wall else None,
+    }
+
+
+def worker_main(args):
+    # Own working directory: archive, journal and telemetry files are data_path() relative to it
+    workdir = tempfile.mkdtemp(prefix="dlbench-")
+    os.chdir(workdir)
+    try:
+        result = run_scenario(args.urls, args.workers)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+    with open(args.result_file, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    return 0
+
+
+def run_worker(urls, workers, timeout):
+    fd, result_file = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--workers", str(workers),
+               "--result-file", result_file, *urls]
+    try:
+        proc = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+        if proc.returncode != 0:
+            tail = (proc.stderr or proc.stdout).strip().splitlines()
+            return {"error": tail[-1] if tail else f"exit code {proc.returncode}"}
+        with open(result_file, encoding="utf-8") as f:
+            return json.load(f)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    finally:
+        os.remove(result_file)
+
+
+# --- Driver ---
+
+def previous_result(version):
+    if not os.path.exists(RESULTS_FILE):
+        return None
+    last = None
+    with open(RESULTS_FILE, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("version") != version:
+                last = entry
+    return last
+
+
+def parse_rate(text):
+    sys.path.insert(0, ROOT)
+    from bandwidth import parse_rate as parse
+    return parse(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="run only this scenario (repeatable)")
+    parser.add_argument("--jobs", type=int, default=4, help="concurrent jobs (distinct videos) per scenario")
+    parser.add_argument("--workers", type=int, help="scheduler workers (default: --jobs)")
+    parser.add_argument("--playlist-size", type=int, default=5, help="videos per playlist page")
+    parser.add_argument("--duration", type=int, default=20, help="clip length in seconds (ffmpeg fixtures)")
+    parser.add_argument("--size-mb", type=int, default=16, help="file size of the synthetic fixtures")
+    parser.add_argument("--server-rate", type=parse_rate, help="bytes/s per server connection, e.g. 5M")
+    parser.add_argument("--latency", type=float, default=0, help="ms of server latency per request")
+    parser.add_argument("--timeout", type=int, default=600, help="seconds per scenario")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    parser.add_argument("urls", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        return worker_main(args)
+
+    fixtures = os.path.join(tempfile.gettempdir(), f"dlbench-fixtures-{args.duration}s-{args.size_mb}mb")
+    available = make_fixtures(fixtures, args.duration, args.size_mb)
+    server = FixtureServer(fixtures, rate=args.server_rate, latency=args.latency / 1000,
+                           playlist_size=args.playlist_size).start()
+
+    result = {
+        "version": read_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "jobs": args.jobs,
+        "server_rate": args.server_rate,
+        "latency_ms": args.latency,
+        "scenarios": {},
+    }
+    try:
+        for scenario in args.scenario or SCENARIOS:
+            if scenario not in available:
+                print(f"Skipping {scenario}: fixtures not available", file=sys.stderr)
+                continue
+            requests_before = next(server.requests)
+            urls = [server.url(scenario, f"{scenario}{i}") for i in range(args.jobs)]
+            scenario_result = run_worker(urls, args.workers or args.jobs, args.timeout)
+            scenario_result["http_requests"] = next(server.requests) - requests_before - 1
+            result["scenarios"][scenario] = scenario_result
+            print(f"{scenario}: {json.dumps(scenario_result)}", file=sys.stderr)
+    finally:
+        server.stop()
+
+    print(json.dumps(result, indent=2))
+    previous = previous_result(result["version"])
+    if previous:
+        for scenario, current in result["scenarios"].items():
+            before = previous.get("scenarios", {}).get(scenario)
+            if before and before.get("throughput_mb_s") and current.get("throughput_mb_s"):
+                change = current["throughput_mb_s"] / before["throughput_mb_s"] - 1
+                print(f"{scenario} throughput vs {previous['version']}: {change * 100:+.0f}%")
+
+    ok = all("error" not in r and r["succeeded"] == r["jobs"] for r in result["scenarios"].values())
+    if not ok:
+        # A broken run would become the baseline of the next comparison
+        print("Some jobs failed, result not saved", file=sys.stderr)
+    elif not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Startup benchmark: import-time profile of the GUI module and time to first frame.
+
+    python benchmarks/startup_bench.py            # from source
+    python benchmarks/startup_bench.py --exe dist/DownloaderVipp.exe
+
+Results are appended to benchmarks/results/startup.jsonl so releases can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(ROOT, "benchmarks", "results", "startup.jsonl")
+HEAVY_MODULES = ("yt_dlp", "PIL", "requests")
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def read_version():
+    try:
+        with open(os.path.join(ROOT, "version.json"), encoding="utf-8") as f:
+            return json.load(f).get("version")
+    except Exception:
+        return None
+
+
+def import_profile(module="gui", top=15):
+    """Runs python -X importtime and returns the cumulative import cost in ms."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append({"module": name, "self_ms": int(self_us) / 1000,
+                         "cumulative_ms": int(cumulative_us) / 1000, "depth": len(indent) // 2})
+    total = next((r["cumulative_ms"] for r in reversed(rows) if r["module"] == module), None)
+    top_level = sorted((r for r in rows if r["depth"] <= 1), key=lambda r: -r["cumulative_ms"])[:top]
+    eager_heavy = sorted({r["module"].split(".")[0] for r in rows} & set(HEAVY_MODULES))
+    return {
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "total_ms": total,
+        "top": [{"module": r["module"], "cumulative_ms": r["cumulative_ms"]} for r in top_level],
+        "heavy_imported_eagerly": eager_heavy,
+    }
+
+
+def time_to_first_frame(command, runs=3, timeout=60):
+    """Starts the app with DOWNLOADER_STARTUP_PROFILE set; the app exits right after its first frame."""
+    samples = []
+    wall = []
+    for _ in range(runs):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        env = dict(os.environ, DOWNLOADER_STARTUP_PROFILE=path)
+        started = time.perf_counter()
+        try:
+            subprocess.run(command, cwd=ROOT, env=env, timeout=timeout, capture_output=True)
+            wall.append(time.perf_counter() - started)
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            samples.append(data["time_to_first_frame"])
+        except Exception as e:
+            print(f"First frame run failed: {e}", file=sys.stderr)
+        finally:
+            os.remove(path)
+    if not samples:
+        return None
+    samples.sort()
+    # Wall time includes interpreter start (and onefile unpacking for the exe)
+    return {"runs": len(samples), "median_s": samples[len(samples) // 2], "min_s": samples[0],
+            "process_wall_median_s": sorted(wall)[len(wall) // 2]}
+
+
+def previous_result(version):
+    if not os.path.exists(RESULTS_FILE):
+        return None
+    last = None
+    with open(RESULTS_FILE, encoding="utf-8") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("version") != version:
+                last = entry
+    return last
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--exe", help="frozen executable to time instead of main.py")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = {
+        "version": read_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": args.exe or "source",
+    }
+    if not args.exe:
+        result["imports"] = import_profile()
+    command = [args.exe] if args.exe else [sys.executable, "main.py"]
+    result["first_frame"] = time_to_first_frame(command, runs=args.runs)
+
+    print(json.dumps(result, indent=2))
+    previous = previous_result(result["version"])
+    if previous and previous.get("first_frame") and result["first_frame"]:
+        delta = result["first_frame"]["median_s"] - previous["first_frame"]["median_s"]
+        print(f"First frame vs {previous['version']}: {delta * 1000:+.0f} ms")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Headless batch downloader. Does not import Tk/customtkinter/PIL.
+
+    python cli.py URL [URL ...]
+    python cli.py -i links.txt --audio -j 4
+    python cli.py -i links.txt --audio-profile m4a
+    cat links.txt | python cli.py -
+
+Progress is printed to stdout as JSON lines, one object per event.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+from config_manager import ConfigManager
+from downloader import VideoDownloader
+from audio_profiles import AUDIO_PROFILES
+from bandwidth import parse_rate
+from url_utils import extract_urls, read_url_file, unique_urls
+from async_core import AsyncDownloader
+from event_bus import PROGRESS, STAGE
+
+
+class JsonLinesReporter:
+    def __init__(self, stream=sys.stdout, progress_interval=0.5):
+        self.stream = stream
+        self.progress_interval = progress_interval
+        self._last_progress = {}
+        self._lock = threading.Lock()
+
+    def emit(self, event, **fields):
+        fields = {"event": event, "time": round(time.time(), 3), **fields}
+        line = json.dumps(fields, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def progress(self, job_id, d):
+        # Rate-limit 'downloading' lines per job, always report the rest
+        now = time.time()
+        if d.get('status') == 'downloading':
+            if now - self._last_progress.get(job_id, 0) < self.progress_interval:
+                return
+            self._last_progress[job_id] = now
+        self.emit(
+            "progress",
+            job=job_id,
+            status=d.get('status'),
+            filename=d.get('filename'),
+            downloaded_bytes=d.get('downloaded_bytes'),
+            total_bytes=d.get('total_bytes') or d.get('total_bytes_estimate'),
+            speed=d.get('speed'),
+            eta=d.get('eta'),
+            playlist_index=d.get('playlist_index'),
+        )
+
+
+def read_urls(args):
+    """Links from the arguments, --input (.txt/.csv) and stdin, cleaned and deduplicated."""
+    urls = []
+    sources = list(args.urls)
+    if args.input:
+        sources.append("@" + args.input)
+    if not sources and not sys.stdin.isatty():
+        sources.append("-")
+
+    for source in sources:
+        if source == "-":
+            urls.extend(extract_urls(sys.stdin.read()))
+        elif source.startswith("@"):
+            urls.extend(read_url_file(source[1:]))
+        else:
+            urls.extend(extract_urls(source))
+    return unique_urls(urls)[0]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Download Vipp - headless batch mode")
+    parser.add_argument("urls", nargs="*", help="links to download, '-' reads them from stdin")
+    parser.add_argument("-i", "--input", help=".txt or .csv file with links (duplicates and tracking params are dropped)")
+    parser.add_argument("-o", "--output", help="download folder (default: the GUI's save location)")
+    parser.add_argument("--audio", action="store_true", help="audio only (format from --audio-profile, else the configured audio profile)")
+    parser.add_argument("--audio-profile", choices=sorted(AUDIO_PROFILES), help="audio format, e.g. m4a/opus copy the source without re-encoding (implies --audio)")
+    parser.add_argument("-j", "--jobs", type=int, help="max concurrent downloads")
+    parser.add_argument("--per-host", type=int, help="max concurrent downloads per site")
+    parser.add_argument("--playlist-items", help='playlist entries to download, e.g. "1-10,15"')
+    parser.add_argument("--limit-rate", type=parse_rate, help="total download speed for the batch, e.g. 5M or 800K")
+    parser.add_argument("--task-rate", type=parse_rate, help="download speed cap per link, e.g. 1M")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the metadata cache")
+    parser.add_argument("--verify-archive", action="store_true", help="check archived files (missing/truncated) and forget the bad ones")
+    parser.add_argument("--metrics", action="store_true", help="emit a metrics event (stage timings, bytes, speeds) per finished download and a gauges event (queue, cache) at the end")
+    parser.add_argument("--prometheus", metavar="FILE", help="write Prometheus text metrics to FILE at the end (node_exporter textfile format)")
+    parser.add_argument("--progress-interval", type=float, default=0.5, help="seconds between progress lines per job")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    urls = read_urls(args)
+    if not urls and not args.verify_archive:
+        print("No links given", file=sys.stderr)
+        return 2
+
+    config = ConfigManager()
+    downloader = VideoDownloader(config)
+    if args.verify_archive:
+        for entry in downloader.archive.verify():
+            print(json.dumps({"event": "archive_problem", **entry}, ensure_ascii=False), flush=True)
+        if not urls:
+            return 0
+    # Command line limits apply to this run only, they are not saved
+    downloader.scheduler.set_limits(max_workers=args.jobs, per_host_limit=args.per_host)
+    if args.limit_rate:
+        downloader.bandwidth.set_limits(global_limit=args.limit_rate)
+    output = args.output or config.get("download_path")
+    os.makedirs(output, exist_ok=True)
+
+    reporter = JsonLinesReporter(stream=sys.stdout, progress_interval=args.progress_interval)
+    # Keep stdout machine-readable: stray prints from the core go to stderr
+    sys.stdout = sys.stderr
+    if args.metrics:
+        downloader.telemetry.add_listener(lambda data: reporter.emit("metrics", **data))
+
+    core = AsyncDownloader(downloader)
+    options = dict(
+        format_type='audio' if args.audio or args.audio_profile else 'video',
+        audio_profile=args.audio_profile,
+        rate_limit=args.task_rate,
+        playlist_items=args.playlist_items,
+    )
+    jobs = dict(enumerate(urls, 1))
+
+    def forward(event):
+        # Bus events -> JSON lines; stages keep their own event names (converting, retrying)
+        event = dict(event) # Shared with the other subscribers
+        name = event.pop('event')
+        event.pop('time', None)
+        if name == PROGRESS:
+            reporter.progress(event['job'], event)
+            return
+        if name == STAGE:
+            name = event.pop('stage')
+        event.setdefault('url', jobs.get(event['job']))
+        reporter.emit(name, **event)
+
+    async def run_batch():
+        stream = downloader.events.stream()
+
+        async def report():
+            async for event in stream:
+                forward(event)
+
+        consumer = asyncio.create_task(report())
+        results = await asyncio.gather(*(
+            core.download(url, output, key=job_id, use_cache=not args.no_cache, **options)
+            for job_id, url in jobs.items()
+        ))
+        stream.close()
+        await consumer
+        return results
+
+    try:
+        results = asyncio.run(run_batch())
+    except KeyboardInterrupt:
+        core.cancel_all()
+        downloader.scheduler.shutdown()
+        reporter.emit("interrupted")
+        return 130
+
+    failed = sum(1 for success, _msg in results if not success)
+    if args.metrics:
+        # Scheduler, bandwidth and info cache figures of the whole run
+        reporter.emit("gauges", **downloader.metrics_gauges())
+    reporter.emit("summary", total=len(jobs), succeeded=len(jobs) - failed, failed=failed)
+    if args.prometheus:
+        try:
+            with open(args.prometheus, "w", encoding="utf-8") as f:
+                f.write(downloader.telemetry.prometheus_text(downloader.metrics_gauges()))
+        except OSError as e:
+            print(f"Cannot write metrics: {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
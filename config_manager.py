@@ -3,12 +3,39 @@ import os
 
 CONFIG_FILE = "config.json"
 
+def data_path(name):
+    """Path of an app data file stored next to config.json."""
+    return os.path.join(os.path.dirname(os.path.abspath(CONFIG_FILE)), name)
+
 class ConfigManager:
     def __init__(self):
         self.default_config = {
             "download_path": os.path.join(os.getcwd(), "downloads"),
             "theme": "Dark",
-            "auto_download": True
+            "auto_download": True,
+            "max_concurrent_downloads": 3,
+            "max_downloads_per_host": 2,
+            "metadata_cache": True,
+            "metadata_cache_max_mb": 64,
+            "archive_verify": True,
+            "fragment_concurrency": 0,
+            "fragment_concurrency_max": 8,
+            "fragment_concurrency_global": 16,
+            "merge_mode": "parallel",
+            "postprocess_workers": 0,
+            "audio_profile": "mp3-192",
+            "audio_bitrate": None,
+            "audio_threads": 0,
+            "bandwidth_limit_kbps": 0,
+            "bandwidth_per_task_kbps": 0,
+            "bandwidth_schedule": [],
+            "retry_max_attempts": 0,
+            "retry_base_delay": 2,
+            "retry_max_delay": 300,
+            "cookie_files": {},
+            "telemetry": True,
+            "metrics_port": 0,
+            "prefetch_depth": 2
         }
         self.config = self.load_config()
 
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+from scheduler import host_key
+
+DEFAULT_SET = "default"
+# mtime checks are at most this frequent
+CHECK_INTERVAL = 5.0
+
+
+def default_cookie_file():
+    """cookies.txt next to the app: working directory, then the exe folder, then the bundled copy."""
+    if os.path.exists("cookies.txt"):
+        return os.path.abspath("cookies.txt")
+    if getattr(sys, 'frozen', False):
+        exe_cookie = os.path.join(os.path.dirname(sys.executable), "cookies.txt")
+        if os.path.exists(exe_cookie):
+            return exe_cookie
+        if hasattr(sys, '_MEIPASS'):
+            bundled_cookie = os.path.join(sys._MEIPASS, "cookies.txt")
+            if os.path.exists(bundled_cookie):
+                return bundled_cookie
+    return None
+
+
+class CookieSet:
+    """One Netscape cookie file and the jar parsed from it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.checked = 0
+        self.jar = None
+
+    def load(self):
+        from ydl_pool import load_yt_dlp
+        YoutubeDLCookieJar = load_yt_dlp().cookies.YoutubeDLCookieJar
+        mtime = os.path.getmtime(self.path)
+        fresh = YoutubeDLCookieJar(self.path)
+        fresh.load(ignore_discard=True, ignore_expires=True)
+        if self.jar is None:
+            self.jar = fresh
+        else:
+            # Swap the contents in place: pooled YoutubeDL instances keep this jar object
+            with self.jar._cookies_lock:
+                self.jar._cookies = fresh._cookies
+        self.mtime = mtime
+        self.checked = time.monotonic()
+
+
+class CookieStore:
+    """
+    Cookies for every YoutubeDL instance, parsed once per file.
+
+    Each cookie set (the default cookies.txt, or a per-domain file from
+    config["cookie_files"] = {"instagram.com": "cookie ig.txt"}) becomes one
+    YoutubeDLCookieJar shared by the pooled instances that use it; the jar is
+    thread-safe and never written back to disk, so concurrent jobs can't
+    clobber each other. A file edited on disk is reloaded on the next job,
+    and a cookies.txt added while the app runs is picked up too.
+    """
+
+    def __init__(self, domain_files=None, default_file=None):
+        self._sets = {}
+        self._domains = {}
+        self._lock = threading.Lock()
+        self._default_file = default_file
+        self._find_default()
+        for domain, path in (domain_files or {}).items():
+            if os.path.exists(path):
+                self._sets[domain] = CookieSet(os.path.abspath(path))
+                self._domains[domain.lower()] = domain
+
+    def _find_default(self):
+        path = self._default_file or default_cookie_file()
+        if path and os.path.exists(path):
+            with self._lock:
+                self._sets.setdefault(DEFAULT_SET, CookieSet(path))
+
+    def set_for(self, url):
+        """Name of the cookie set to use for url, or None if there are no cookies."""
+        # The configured domain and its subdomains, never its parent
+        # (a music.youtube.com file is not used for youtube.com)
+        try:
+            hostname = (urlparse(url).hostname or "").lower()
+        except ValueError:
+            hostname = ""
+        name = self._domains.get(host_key(url))
+        if name is None:
+            for domain, candidate in self._domains.items():
+                if hostname == domain or hostname.endswith("." + domain):
+                    name = candidate
+                    break
+        if name is None:
+            if DEFAULT_SET not in self._sets:
+                self._find_default()
+            if DEFAULT_SET in self._sets:
+                name = DEFAULT_SET
+        return name
+
+    def jar(self, name):
+        """Shared jar of a cookie set, loaded on first use and reloaded when the file changed."""
+        cookie_set = self._sets[name]
+        with self._lock:
+            try:
+                if cookie_set.jar is None:
+                    cookie_set.load()
+                elif time.monotonic() - cookie_set.checked > CHECK_INTERVAL:
+                    cookie_set.checked = time.monotonic()
+                    if os.path.getmtime(cookie_set.path) != cookie_set.mtime:
+                        cookie_set.load()
+            except Exception as e:
+                print(f"Cookie file error ({cookie_set.path}): {e}")
+        return cookie_set.jar
+
+    def refresh(self):
+        """Reloads every loaded set whose file changed."""
+        with self._lock:
+            for cookie_set in self._sets.values():
+                try:
+                    if cookie_set.jar is not None and os.path.getmtime(cookie_set.path) != cookie_set.mtime:
+                        cookie_set.load()
+                except Exception as e:
+                    print(f"Cookie file error ({cookie_set.path}): {e}")
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from url_utils import youtube_ids
+
+CHUNK = 1024 * 1024
+
+
+def make_archive_id(extractor, video_id):
+    """Same id format as yt-dlp's --download-archive: "<extractor lowercase> <id>"."""
+    return f"{extractor.lower()} {video_id}"
+
+
+def quick_checksum(path):
+    """sha256 of size + first and last MiB. Cheap enough for multi-GB files."""
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(CHUNK))
+        if size > CHUNK:
+            f.seek(max(CHUNK, size - CHUNK))
+            digest.update(f.read(CHUNK))
+    return digest.hexdigest()
+
+
+class DownloadArchive:
+    """
+    Index of finished downloads: archive id -> file path, size, checksum, format.
+
+    It is handed to yt-dlp as the `download_archive` param (yt-dlp only needs
+    `in` and `add`), so both single URLs and playlist entries are skipped
+    before any extraction. With verify=True an entry only counts while its
+    file still exists with the recorded size.
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        self.verify_files = verify
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS archive (
+                archive_id TEXT PRIMARY KEY,
+                extractor TEXT,
+                video_id TEXT,
+                path TEXT,
+                size INTEGER,
+                checksum TEXT,
+                format_id TEXT,
+                downloaded_at REAL NOT NULL
+            )""")
+        self._db.commit()
+
+    def __repr__(self):
+        # Part of the YoutubeDL pool key, keep it stable
+        return f"DownloadArchive({self.path!r})"
+
+    # --- yt-dlp download_archive protocol ---
+    def __contains__(self, archive_id):
+        entry = self.get(archive_id)
+        if entry is None:
+            return False
+        if self.verify_files and entry['path']:
+            return self._file_ok(entry)
+        return True
+
+    def add(self, archive_id):
+        # yt-dlp calls this after the file is done; details come from record()
+        extractor, _, video_id = archive_id.partition(" ")
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO archive (archive_id, extractor, video_id, downloaded_at) VALUES (?, ?, ?, ?)",
+                (archive_id, extractor, video_id, time.time()))
+            self._db.commit()
+
+    # --- Details ---
+    def record(self, info):
+        """Stores path/size/checksum for a finished info dict (called by ArchivePP)."""
+        extractor = info.get('extractor_key') or info.get('ie_key')
+        path = info.get('filepath')
+        if not extractor or not info.get('id') or not path or not os.path.exists(path):
+            return
+        archive_id = make_archive_id(extractor, info['id'])
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO archive (archive_id, extractor, video_id, path, size, checksum, format_id, downloaded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (archive_id, extractor.lower(), info['id'], os.path.abspath(path), os.path.getsize(path),
+                 quick_checksum(path), info.get('format_id'), time.time()))
+            self._db.commit()
+
+    def get(self, archive_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT archive_id, path, size, checksum, format_id FROM archive WHERE archive_id = ?",
+                (archive_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('archive_id', 'path', 'size', 'checksum', 'format_id'), row))
+
+    def contains_entry(self, entry):
+        """For flat playlist entries / info dicts."""
+        extractor = entry.get('extractor_key') or entry.get('ie_key')
+        if not extractor or not entry.get('id'):
+            return False
+        return make_archive_id(extractor, entry['id']) in self
+
+    def lookup_url(self, url):
+        """
+        Archive entry for a URL without any network access, or None.
+        The id is taken from the URL the same way yt-dlp does before extracting.
+        """
+        video_id, playlist_id = youtube_ids(url)
+        if video_id and not playlist_id:
+            archive_id = make_archive_id("youtube", video_id)
+        else:
+            archive_id = self._archive_id_from_extractors(url)
+        if archive_id and archive_id in self:
+            return self.get(archive_id)
+        return None
+
+    @staticmethod
+    def _archive_id_from_extractors(url):
+        from ydl_pool import load_yt_dlp
+        for ie in load_yt_dlp().extractor.gen_extractor_classes():
+            if ie.ie_key() == 'Generic' or not ie.suitable(url):
+                continue
+            temp_id = ie.get_temp_id(url)
+            return make_archive_id(ie.ie_key(), temp_id) if temp_id else None
+        return None
+
+    def _file_ok(self, entry, full=False):
+        path = entry['path']
+        if not os.path.exists(path):
+            return False
+        if entry['size'] is not None and os.path.getsize(path) != entry['size']:
+            return False
+        if full and entry['checksum'] and quick_checksum(path) != entry['checksum']:
+            return False
+        return True
+
+    def verify(self, remove=True):
+        """
+        Checks every recorded file (existence, size, checksum).
+        Returns the bad entries; with remove=True they are dropped so the
+        next run downloads them again.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT archive_id, path, size, checksum, format_id FROM archive WHERE path IS NOT NULL").fetchall()
+        bad = []
+        for row in rows:
+            entry = dict(zip(('archive_id', 'path', 'size', 'checksum', 'format_id'), row))
+            if not self._file_ok(entry, full=True):
+                if not os.path.exists(entry['path']):
+                    entry['problem'] = 'missing'
+                elif os.path.getsize(entry['path']) != entry['size']:
+                    entry['problem'] = 'truncated'
+                else:
+                    entry['problem'] = 'checksum'
+                bad.append(entry)
+        if remove and bad:
+            with self._lock:
+                self._db.executemany("DELETE FROM archive WHERE archive_id = ?", [(e['archive_id'],) for e in bad])
+                self._db.commit()
+        return bad
+
+    def remove(self, archive_id):
+        with self._lock:
+            self._db.execute("DELETE FROM archive WHERE archive_id = ?", (archive_id,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
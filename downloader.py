@@ -1,50 +1,304 @@
-import yt_dlp
+import copy
 import os
 import threading
+import time
+from contextlib import contextmanager
+from scheduler import DownloadScheduler, RUNNING, host_key
+from ydl_pool import YoutubeDLPool, load_yt_dlp
+from metadata_cache import MetadataCache
+from job_journal import JobJournal
+from download_archive import DownloadArchive
+from fragment_tuner import FragmentTuner
+from postprocess_pool import PostProcessPool, CONVERTING, RETRYING
+from audio_profiles import build_audio_opts, DEFAULT_PROFILE
+from bandwidth import BandwidthManager, parse_rate
+from retry_policy import RetryPolicy, CircuitBreaker, classify, CANCELLED, REEXTRACT, GIVE_UP
+from config_manager import data_path
+from cookie_store import CookieStore
+from telemetry import Telemetry, TRANSCODE
+from event_bus import EventBus, PROGRESS, STAGE, FINISHED, ERROR
+from prefetcher import Prefetcher
+from metadata_cache import stream_expiry, EXPIRY_MARGIN
 
-class VideoDownloader:
-    def __init__(self):
-        pass
+# How the video and audio streams of a merged format are fetched:
+# 'parallel' downloads them at the same time, 'sequential' is yt-dlp's
+# default, 'ffmpeg' lets ffmpeg read both streams and mux them directly
+# (no intermediate files, coarser progress)
+MERGE_MODES = ('parallel', 'sequential', 'ffmpeg')
 
-    def _get_cookie_file(self, url):
-        cookie_path = None
-        
-        # 1. Try Current Working Directory
-        if os.path.exists("cookies.txt"):
-            cookie_path = os.path.abspath("cookies.txt")
-            
-        # 2. Try EXE Directory (if frozen)
-        elif getattr(sys, 'frozen', False):
-            exe_dir = os.path.dirname(sys.executable)
-            exe_cookie = os.path.join(exe_dir, "cookies.txt")
-            if os.path.exists(exe_cookie):
-                cookie_path = exe_cookie
-                
-            # 3. Try Bundled Resource (pyinstaller)
-            elif hasattr(sys, '_MEIPASS'):
-                bundled_cookie = os.path.join(sys._MEIPASS, "cookies.txt")
-                if os.path.exists(bundled_cookie):
-                    cookie_path = bundled_cookie
-        
-        # Copy to TEMP to avoid locking/path issues with yt-dlp
-        if cookie_path:
+
+class StreamProgress:
+    """
+    Progress hook wrapper reporting the streams of one merged format
+    (video + audio) as a single download: bytes and speed are summed and
+    'finished' is only passed on once every stream is done.
+    """
+
+    def __init__(self, hook):
+        self.hook = hook
+        self._streams = {}  # filename -> last status dict
+        self._lock = threading.Lock()
+
+    def __call__(self, d):
+        group = (d.get('info_dict') or {}).get('_stream_group')
+        if not group:
+            return self.hook(d)
+        _video_id, count, expected = group
+        with self._lock:
+            self._streams[d.get('filename')] = d
+            streams = list(self._streams.values())
+        finished = [s for s in streams if s.get('status') == 'finished']
+        downloaded = sum(s.get('downloaded_bytes') or s.get('total_bytes') or 0 for s in streams)
+        total = sum(s.get('total_bytes') or s.get('total_bytes_estimate') or 0 for s in streams)
+        if len(streams) < count:
+            total = max(total, expected)
+        merged = dict(d, downloaded_bytes=downloaded, total_bytes=total or None,
+                      speed=sum(s.get('speed') or 0 for s in streams if s.get('status') == 'downloading') or None)
+        merged.pop('total_bytes_estimate', None)
+        merged.pop('eta', None)
+        if len(finished) == count:
+            with self._lock:
+                self._streams = {}
+        else:
+            merged['status'] = 'downloading'
+        if merged.get('speed') and total and total > downloaded:
+            merged['eta'] = (total - downloaded) / merged['speed']
+        self.hook(merged)
+
+class VideoDownloader:
+    def __init__(self, config=None):
+        self.config = config
+        # Central job queue shared by every task (GUI cards, batch runs)
+        self.scheduler = DownloadScheduler(
+            max_workers=self._config_get("max_concurrent_downloads", 3),
+            per_host_limit=self._config_get("max_downloads_per_host", 2),
+        )
+        # Long-lived YoutubeDL instances leased per call
+        self.ydl_pool = YoutubeDLPool(setup=self._setup_ydl, factory=self._make_ydl)
+        self.metadata_cache = MetadataCache(
+            data_path("metadata_cache.db"),
+            max_bytes=int(self._config_get("metadata_cache_max_mb", 64)) * 1024 * 1024,
+            enabled=bool(self._config_get("metadata_cache", True)),
+        )
+        # Persisted jobs, rehydrated by the GUI on the next start
+        self.journal = JobJournal(data_path("jobs.db"))
+        # Already downloaded videos, consulted before any network work
+        self.archive = DownloadArchive(data_path("archive.db"), verify=bool(self._config_get("archive_verify", True)))
+        # HLS/DASH fragment connections per job, 0 in config = adaptive
+        self.fragment_tuner = FragmentTuner(
+            per_job_max=int(self._config_get("fragment_concurrency_max", 8)),
+            global_max=int(self._config_get("fragment_concurrency_global", 16)),
+            fixed=int(self._config_get("fragment_concurrency", 0)) or None,
+        )
+        # ffmpeg conversions run here, not on the scheduler's network workers
+        self.postprocess_pool = PostProcessPool(int(self._config_get("postprocess_workers", 0)) or None)
+        # Rate limits shared by all running downloads (kbps in config, 0 = unlimited)
+        self.bandwidth = BandwidthManager(
+            global_limit=int(self._config_get("bandwidth_limit_kbps", 0)) * 1024 or None,
+            per_task_limit=int(self._config_get("bandwidth_per_task_kbps", 0)) * 1024 or None,
+            schedule=self._config_get("bandwidth_schedule", []),
+        )
+        # Failed downloads are retried depending on why they failed
+        self.retry_policy = RetryPolicy(
+            max_attempts=int(self._config_get("retry_max_attempts", 0)) or None,
+            base_delay=float(self._config_get("retry_base_delay", 2)),
+            max_delay=float(self._config_get("retry_max_delay", 300)),
+        )
+        self.circuit_breaker = CircuitBreaker()
+        # cookies.txt (and per-domain files) parsed once, shared by all instances
+        self.cookies = CookieStore(self._config_get("cookie_files", {}))
+        # Lifecycle and progress of every job, for the GUI, the CLI and async consumers
+        self.events = EventBus()
+        # Per-job stage timings and throughput, appended to telemetry.jsonl
+        self.telemetry = Telemetry(data_path("telemetry.jsonl"), enabled=bool(self._config_get("telemetry", True)))
+        # Extraction of the next queued jobs while the slots are downloading
+        self.prefetcher = Prefetcher(self, depth=int(self._config_get("prefetch_depth", 2)))
+        self.scheduler.add_listener(self.prefetcher.on_job_state)
+        metrics_port = int(self._config_get("metrics_port", 0))
+        if metrics_port:
             try:
-                temp_dir = os.environ.get('TEMP', '.')
-                temp_cookie = os.path.join(temp_dir, "ytb_temp_cookies.txt")
-                # Simple copy
-                with open(cookie_path, 'rb') as src, open(temp_cookie, 'wb') as dst:
-                    dst.write(src.read())
-                return temp_cookie
-            except Exception as e:
-                print(f"Error copying cookie: {e}")
-                return cookie_path
-                
-        return None
+                self.telemetry.serve(metrics_port, gauges=self.metrics_gauges)
+            except OSError as e:
+                print(f"Metrics endpoint error: {e}")
+
+    @staticmethod
+    def _make_ydl(params):
+        load_yt_dlp()
+        from ydl_extensions import PipelineYoutubeDL
+        return PipelineYoutubeDL(params)
+
+    def _setup_ydl(self, ydl):
+        # Called once per pooled YoutubeDL
+        cookie_set = ydl.params.get('cookie_set')
+        jar = self.cookies.jar(cookie_set) if cookie_set else None
+        if jar is not None:
+            # Shared in-memory jar instead of a cookiefile per instance
+            ydl.cookiejar = jar
+        if ydl.params.get('download_archive') is self.archive:
+            from ydl_extensions import ArchivePP
+            ydl.add_post_processor(ArchivePP(ydl, self.archive), when='after_move')
+        for pp_def in ydl.params.get('deferred_postprocessors') or []:
+            from ydl_extensions import DeferredPP
+            ydl.add_post_processor(DeferredPP(ydl, pp_def), when='post_process')
+
+    def find_archived(self, url):
+        """Archive entry if url was already downloaded (no network access), else None."""
+        try:
+            return self.archive.lookup_url(url)
+        except Exception as e:
+            print(f"Archive lookup error: {e}")
+            return None
+
+    def _config_get(self, key, default):
+        if self.config is None:
+            return default
+        value = self.config.get(key)
+        return default if value is None else value
+
+    def set_max_concurrency(self, max_workers=None, per_host_limit=None):
+        """Updates the scheduler limits live and persists them."""
+        self.scheduler.set_limits(max_workers=max_workers, per_host_limit=per_host_limit)
+        if self.config is not None:
+            if max_workers is not None:
+                self.config.set("max_concurrent_downloads", int(max_workers))
+            if per_host_limit is not None:
+                self.config.set("max_downloads_per_host", int(per_host_limit))
+
+    def set_bandwidth_limits(self, global_kbps=None, per_task_kbps=None):
+        """Changes the rate limits live (0 = unlimited) and persists them."""
+        if global_kbps is not None:
+            self.bandwidth.set_limits(global_limit=int(global_kbps) * 1024 or None)
+            if self.config is not None:
+                self.config.set("bandwidth_limit_kbps", int(global_kbps))
+        if per_task_kbps is not None:
+            self.bandwidth.set_limits(per_task_limit=int(per_task_kbps) * 1024 or None)
+            if self.config is not None:
+                self.config.set("bandwidth_per_task_kbps", int(per_task_kbps))
 
-    def get_video_info(self, url):
+    def metrics_gauges(self):
+        """Current state of the shared components, for the Prometheus export."""
+        scheduler = self.scheduler.stats()
+        postprocess = self.postprocess_pool.stats()
+        bandwidth = self.bandwidth.stats()
+        cache = self.metadata_cache.stats()
+        return {
+            'jobs_running': scheduler.get(RUNNING, 0),
+            'jobs_queued': len(self.scheduler.queued_jobs()),
+            'postprocess_active': postprocess['active'],
+            'bandwidth_limit_bytes': bandwidth['limit'] or 0,
+            'hosts_paused': len(self.circuit_breaker.stats()),
+            'prefetch_ready': self.prefetcher.stats()['ready'],
+            'info_cache_hits': cache['hits'],
+            'info_cache_misses': cache['misses'],
+            'info_cache_expired': cache['expired'],
+            'info_cache_evictions': cache['evictions'],
+            'info_cache_entries': cache['entries'],
+            'info_cache_hit_rate': round(cache['hit_rate'], 3),
+        }
+
+    def _cookie_opts(self, ydl_opts, url):
+        # The set name is part of the pool key, _setup_ydl gives the instance its jar
+        name = self.cookies.set_for(url)
+        if name:
+            ydl_opts['cookie_set'] = name
+            self.cookies.jar(name) # Reloads the file if it changed on disk
+
+    def get_video_info(self, url, use_cache=True):
         """
         Extracts video information without downloading.
+        use_cache=False bypasses the metadata cache and refreshes the entry.
         """
+        prefetched = self._take_prefetched(url)
+        if prefetched is not None:
+            return prefetched
+        if use_cache:
+            cached = self.metadata_cache.get(url)
+            if cached is not None:
+                self.telemetry.record_extract(url, 0, cached=True)
+                return cached
+        return self.extract_info(url)
+
+    def extract_info(self, url):
+        """get_video_info without the caches: always extracts, then caches the result."""
+        try:
+            started = time.monotonic()
+            with self.ydl_pool.lease(self._info_opts(url)) as ydl:
+                info = ydl.extract_info(url, download=False)
+                self._cache_info(url, ydl, info)
+                self.telemetry.record_extract(url, time.monotonic() - started)
+                return info
+        except Exception as e:
+            return {'error': str(e)}
+
+    def stream_info(self, url, page_size=100, use_cache=True):
+        """
+        Generator version of get_video_info that pages through playlists.
+        Yields the info dict first; for a playlist it has no 'entries' yet
+        and is followed by lists of up to page_size flat entries, as yt-dlp
+        fetches the pages. Errors are yielded as {'error': ...}.
+        The complete playlist is cached once every page has been read.
+        """
+        prefetched = self._take_prefetched(url)
+        if prefetched is not None:
+            yield prefetched
+            return
+        if use_cache:
+            cached = self.metadata_cache.get(url)
+            if cached is not None:
+                self.telemetry.record_extract(url, 0, cached=True)
+                yield cached
+                return
+
+        video = None
+        try:
+            started = time.monotonic()
+            with self.ydl_pool.lease(self._info_opts(url)) as ydl:
+                # process=False leaves 'entries' as the extractor's lazy page iterator
+                info = ydl.extract_info(url, download=False, process=False)
+                if info.get('_type') in ('url', 'url_transparent'):
+                    info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+                if not self._is_playlist(info):
+                    video = ydl.process_ie_result(info, download=False)
+                    self._cache_info(url, ydl, video)
+                    self.telemetry.record_extract(url, time.monotonic() - started)
+                else:
+                    entries = info.pop('entries', None) or []
+                    yield dict(info)
+                    loaded, page = [], []
+                    for entry in entries:
+                        page.append(entry)
+                        if len(page) >= page_size:
+                            loaded.extend(page)
+                            yield page
+                            page = []
+                    if page:
+                        loaded.extend(page)
+                        yield page
+                    self._cache_info(url, ydl, dict(info, entries=loaded))
+                    # Includes the time the consumer spent between pages
+                    self.telemetry.record_extract(url, time.monotonic() - started)
+        except Exception as e:
+            yield {'error': str(e)}
+            return
+        if video is not None:
+            # Yielded once the lease is over: a consumer that stops after the
+            # first item must not keep the instance out of the pool
+            yield video
+
+    def _take_prefetched(self, url):
+        info = self.prefetcher.take(url)
+        if info is not None:
+            # Extracted off the job's critical path
+            self.telemetry.record_extract(url, 0, cached=True)
+        return info
+
+    @staticmethod
+    def _info_fresh(info):
+        """False when the signed stream URLs of info expire within EXPIRY_MARGIN."""
+        expiry = stream_expiry(info)
+        return not expiry or expiry - EXPIRY_MARGIN > time.time()
+
+    def _info_opts(self, url):
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
@@ -54,35 +308,64 @@ class VideoDownloader:
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         }
         
-        cookie_file = self._get_cookie_file(url)
-        if cookie_file:
-            ydl_opts['cookiefile'] = cookie_file
+        self._cookie_opts(ydl_opts, url)
+        return ydl_opts
 
+    def _cache_info(self, url, ydl, info):
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return info
+            self.metadata_cache.put(url, ydl.sanitize_info(info))
         except Exception as e:
-            return {'error': str(e)}
+            print(f"Metadata cache error: {e}")
+
+    @staticmethod
+    def _is_playlist(info):
+        return info.get('_type') == 'playlist' or 'entries' in info
 
-    def download_video(self, url, output_path, format_type='video', progress_hook=None, playlist_name=None, playlist_items=None):
+    def download_video(self, url, output_path, format_type='video', progress_hook=None, playlist_name=None, playlist_items=None, info=None, job_id=None, stage_hook=None, audio_profile=None, rate_limit=None, is_cancelled=None, event_key=None):
         """
         Downloads the video.
-        format_type: 'video' (best video+audio) or 'audio' (mp3)
+        format_type: 'video' (best video+audio) or 'audio' (see audio_profiles)
         playlist_items: string of indices (e.g. "1,2,5-10")
+        info: dict already returned by get_video_info. When given, the page is
+              not extracted a second time; for playlists only the selected
+              entries of the flat listing are resolved.
+        job_id: JobJournal id; status and bytes done are recorded there.
+        stage_hook: stage_hook(stage, **details) with CONVERTING once the network
+                    part is done and conversions are still running on the
+                    post-processing pool, RETRYING before a retry.
+        audio_profile: AUDIO_PROFILES key, defaults to the configured one.
+        rate_limit: cap for this job ('2M', bytes/s...), on top of the global limit.
+        is_cancelled: callable checked while waiting between retries.
+        event_key: 'job' of the events published on self.events (default: job_id, else url).
         """
+        if event_key is None:
+            event_key = job_id if job_id is not None else url
+        job = self.scheduler.current_job()
+        metrics = self.telemetry.start_job(url, host_key(url), job.queue_wait if job else None)
+        hooks = [StreamProgress(progress_hook)] if progress_hook else []
+        hooks.append(StreamProgress(self._event_hook(event_key)))
+        hooks.append(metrics.progress_hook)
+        if job_id is not None:
+            self.journal.set_status(job_id, RUNNING)
+            hooks.append(StreamProgress(self.journal.progress_hook(job_id)))
+        fragments = self.fragment_tuner.acquire(url)
+        hooks.append(fragments.progress_hook)
+        shaper = self.bandwidth.acquire(parse_rate(rate_limit))
+        hooks.append(shaper.progress_hook)
+
         ydl_opts = {
-            'progress_hooks': [progress_hook] if progress_hook else [],
+            'progress_hooks': hooks,
+            'postprocessor_hooks': [metrics.postprocessor_hook],
+            'log_hooks': [fragments.log_hook],
             'quiet': True,
             'no_warnings': True,
+            'continuedl': True, # Resume .part files left by an interrupted run (HTTP range)
+            'download_archive': self.archive, # Skips videos already in the archive before extracting them
             'socket_timeout': 300, # 5 min timeout for downloads
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         }
         
-        cookie_file = self._get_cookie_file(url)
-        if cookie_file:
-            # print(f"Using cookie file: {cookie_file}")
-            ydl_opts['cookiefile'] = cookie_file
+        self._cookie_opts(ydl_opts, url)
 
         # 1. Output Template Logic
         if playlist_name:
@@ -101,23 +384,191 @@ class VideoDownloader:
 
         # 2. Format Logic (Auto MP4)
         if format_type == 'audio':
-            ydl_opts.update({
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-            })
+            ydl_opts.update(build_audio_opts(
+                audio_profile or self._config_get("audio_profile", DEFAULT_PROFILE),
+                bitrate=self._config_get("audio_bitrate", None),
+                threads=int(self._config_get("audio_threads", 0)),
+            ))
         else:
             # Force MP4 container merging if needed
             ydl_opts.update({
                 'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
                 'merge_output_format': 'mp4',
             })
-        
+            merge_mode = self._config_get("merge_mode", "parallel")
+            if merge_mode == 'parallel':
+                ydl_opts['parallel_streams'] = True
+            elif merge_mode == 'ffmpeg':
+                ydl_opts['external_downloader'] = {'default': 'ffmpeg'}
+
+        if info and 'error' not in info and not self._info_fresh(info):
+            # Extracted too long ago (queued, prefetched, dialog left open): fresh stream URLs
+            self.metadata_cache.invalidate(url)
+            info = None
+
+        batch = self.postprocess_pool.batch()
+
+        def on_lease(ydl):
+            fragments.bind(ydl.params)
+            shaper.bind(ydl.params)
+            ydl.params['postprocess_batch'] = batch
+
+            def unbind():
+                # Live limit changes must not reach the instance once it is back in the pool
+                fragments.unbind()
+                shaper.unbind()
+            return unbind
+
+        def on_stage(stage, **details):
+            self.events.publish(STAGE, event_key, stage=stage, **details)
+            if stage_hook:
+                stage_hook(stage, **details)
+
+        success, msg = self._download_with_retries(url, ydl_opts, info, on_lease, on_stage, is_cancelled, metrics)
+        self.fragment_tuner.release(fragments, None if success else msg)
+        self.bandwidth.release(shaper)
+        started = time.monotonic()
+        success, msg = self._finish_postprocess(batch, success, msg, on_stage)
+        if batch.futures:
+            metrics.add(TRANSCODE, time.monotonic() - started)
+        if job_id is not None:
+            self.journal.finish(job_id, success, msg)
+        self.telemetry.finish_job(metrics, success, msg)
+        self.events.publish(FINISHED if success else ERROR, event_key, message=msg)
+        return success, msg
+
+    def _event_hook(self, key):
+        def hook(d):
+            self.events.publish(
+                PROGRESS, key,
+                status=d.get('status'),
+                filename=d.get('filename'),
+                downloaded_bytes=d.get('downloaded_bytes'),
+                total_bytes=d.get('total_bytes') or d.get('total_bytes_estimate'),
+                speed=d.get('speed'),
+                eta=d.get('eta'),
+                playlist_index=d.get('playlist_index') or (d.get('info_dict') or {}).get('playlist_index'),
+            )
+        return hook
+
+    def _download_with_retries(self, url, ydl_opts, info, on_lease, stage_hook=None, is_cancelled=None, metrics=None):
+        """
+        _run_download plus retries: the failure is classified (retry_policy)
+        and retried with backoff, resuming the .part file (continuedl), or
+        with fresh stream URLs when they expired. Throttling/network errors
+        feed a per-host circuit breaker shared by all jobs, which also pauses
+        the host in the scheduler. Waits give the scheduler slot back (_wait).
+        """
+        host = host_key(url)
+        attempt = 0
+        while True:
+            self._wait(self.circuit_breaker.wait_time(host), is_cancelled)
+            if is_cancelled and is_cancelled():
+                return False, "Stopped by user"
+            if metrics:
+                metrics.begin_attempt()
+            success, msg = self._run_download(url, ydl_opts, info, on_lease=on_lease)
+            if metrics:
+                metrics.end_attempt()
+            if success:
+                self.circuit_breaker.record_success(host)
+                return success, msg
+            kind = classify(msg)
+            if kind == CANCELLED:
+                return success, msg
+            self.circuit_breaker.record_failure(host, kind)
+            paused = self.circuit_breaker.wait_time(host)
+            if paused:
+                self.scheduler.pause_host(host, paused)
+            action, delay = self.retry_policy.decide(kind, attempt)
+            if action == GIVE_UP:
+                return success, msg
+            attempt += 1
+            if metrics:
+                metrics.retries = attempt
+            if action == REEXTRACT:
+                # Signed URLs in the cached info are stale, extract again
+                self.metadata_cache.invalidate(url)
+                info = None
+            print(f"Retry {attempt} for {url} in {delay:.0f}s ({kind}): {msg}")
+            if stage_hook:
+                stage_hook(RETRYING, attempt=attempt, reason=kind, delay=round(delay, 1))
+            if not self._wait(delay, is_cancelled):
+                return False, "Stopped by user"
+
+    def _wait(self, seconds, is_cancelled=None):
+        """
+        Sleeps for a retry or an open breaker. Inside a scheduler job the
+        worker and host slot are given back meanwhile (Job.sleep), so a
+        throttled host does not hold workers other hosts could use.
+        """
+        if seconds <= 0:
+            return not (is_cancelled and is_cancelled())
+        job = self.scheduler.current_job()
+        if job:
+            return job.sleep(seconds, is_cancelled)
+        return self._sleep(seconds, is_cancelled)
+
+    @staticmethod
+    def _sleep(seconds, is_cancelled=None):
+        """Sleeps in short steps; returns False if cancelled meanwhile."""
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            if is_cancelled and is_cancelled():
+                return False
+            time.sleep(min(0.5, end - time.monotonic()))
+        return True
+
+    def _finish_postprocess(self, batch, success, msg, stage_hook=None):
+        """Waits for the job's conversions without holding a download slot."""
+        if not batch.futures:
+            return success, msg
+        if batch.pending():
+            job = self.scheduler.current_job()
+            if job:
+                job.yield_slot()
+            if stage_hook:
+                stage_hook(CONVERTING, pending=batch.pending())
+        results, errors = batch.wait()
+        for converted in results:
+            # The archive recorded the file before conversion
+            try:
+                self.archive.record(converted)
+            except Exception as e:
+                print(f"Archive record error: {e}")
+        if errors and success:
+            return False, f"Conversion failed: {errors[0]}"
+        return success, msg
+
+    @contextmanager
+    def _lease(self, ydl_opts, on_lease=None):
+        """
+        Pool lease with the job's bindings: on_lease(ydl) may return a
+        callable that undoes them, called before the instance is released.
+        """
+        with self.ydl_pool.lease(ydl_opts) as ydl:
+            unbind = on_lease(ydl) if on_lease else None
+            try:
+                yield ydl
+            finally:
+                if unbind:
+                    unbind()
+
+    def _run_download(self, url, ydl_opts, info=None, on_lease=None):
+        if info and 'error' not in info:
+            try:
+                with self._lease(ydl_opts, on_lease) as ydl:
+                    # process_ie_result mutates the dict, keep the caller's copy intact
+                    ydl.process_ie_result(copy.deepcopy(info), download=True)
+                return True, "Download Complete"
+            except Exception as e:
+                if self._is_playlist(info) or "Stopped by user" in str(e):
+                    return False, str(e)
+                # Same fallback as yt-dlp's --load-info-json: extract again from the URL
+                print(f"Reusing info failed, extracting again: {e}")
+
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with self._lease(ydl_opts, on_lease) as ydl:
                 ydl.download([url])
             return True, "Download Complete"
         except Exception as e:
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Events of one job, in the order they can happen
+QUEUED = "queued"
+STARTED = "started"
+INFO = "info"
+SKIPPED = "skipped"
+SELECTING = "selecting"  # waiting for the user to pick playlist entries
+PROGRESS = "progress"
+STAGE = "stage"          # converting / retrying, see postprocess_pool
+FINISHED = "finished"
+ERROR = "error"
+CANCELLED = "cancelled"
+TERMINAL = (SKIPPED, FINISHED, ERROR, CANCELLED)
+
+
+class EventBuffer:
+    """
+    Thread-safe buffer of one subscriber. 'downloading' progress events are
+    coalesced per job (only the latest is kept) and dropped once a later
+    event of that job arrives, so a slow consumer never falls behind.
+    """
+
+    def __init__(self, max_events=10000):
+        self._events = deque(maxlen=max_events)
+        self._progress = OrderedDict()  # job -> latest progress event
+        self._lock = threading.Lock()
+
+    def push(self, data):
+        with self._lock:
+            if data['event'] == PROGRESS and data.get('status') == 'downloading':
+                self._progress.pop(data['job'], None)
+                self._progress[data['job']] = data
+            else:
+                self._progress.pop(data['job'], None)
+                self._events.append(data)
+
+    def drain(self):
+        """Pending events: lifecycle events in order, then the latest progress of each job."""
+        with self._lock:
+            events = list(self._events)
+            events.extend(self._progress.values())
+            self._events.clear()
+            self._progress.clear()
+        return events
+
+    def __len__(self):
+        with self._lock:
+            return len(self._events) + len(self._progress)
+
+
+class EventStream(EventBuffer):
+    """
+    Async iterator over the events of a bus, for asyncio consumers:
+
+        async for event in bus.stream():
+            ...
+    """
+
+    def __init__(self, bus, loop, max_events=10000):
+        super().__init__(max_events)
+        self.bus = bus
+        self.loop = loop
+        self._ready = asyncio.Event()
+        self._pending = deque()
+        self._closed = False
+
+    def push(self, data):
+        super().push(data)
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Loop closed, the consumer is gone
+            self.bus.unsubscribe(self.push)
+
+    def close(self):
+        self._closed = True
+        self.bus.unsubscribe(self.push)
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._pending:
+            self._ready.clear()
+            self._pending = deque(self.drain())
+            if self._pending:
+                break
+            if self._closed:
+                raise StopAsyncIteration
+            await self._ready.wait()
+        return self._pending.popleft()
+
+
+class EventBus:
+    """
+    Job lifecycle and progress events, published from any thread.
+    An event is a dict {'event': name, 'job': key, 'time': ..., **fields}.
+
+    Subscribers are plain callbacks (run on the publishing thread, keep them
+    short), buffers drained by a UI timer (poller(), for Tk) or async
+    iterators (stream(), for asyncio consumers such as the CLI).
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def publish(self, event, job=None, **fields):
+        data = {'event': event, 'job': job, 'time': time.time(), **fields}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"Event subscriber error: {e}")
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def poller(self, max_events=10000):
+        """EventBuffer to drain() from a timer, e.g. the GUI's repaint loop."""
+        buffer = EventBuffer(max_events)
+        self.subscribe(buffer.push)
+        return buffer
+
+    def stream(self, loop=None, max_events=10000):
+        """EventStream bound to loop (default: the running loop)."""
+        stream = EventStream(self, loop or asyncio.get_running_loop(), max_events)
+        self.subscribe(stream.push)
+        return stream
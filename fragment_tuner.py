@@ -0,0 +1,150 @@
+import re
+import threading
+import time
+
+from scheduler import host_key
+
+# Messages that mean the server wants us to slow down
+THROTTLE_RE = re.compile(r"HTTP Error (429|5\d\d)|Too Many Requests|Service Unavailable", re.I)
+
+
+class FragmentLease:
+    """
+    Fragment concurrency granted to one download job.
+    Hook it into yt-dlp with progress_hook/log_hook and bind() it to the
+    YoutubeDL params; the value is re-tuned between files of the same job
+    (video then audio stream, playlist entries) because yt-dlp reads
+    concurrent_fragment_downloads each time a fragmented download starts.
+    """
+
+    def __init__(self, tuner, host, n):
+        self.tuner = tuner
+        self.host = host
+        self.n = n
+        self.params = None
+        self.throttled = False
+        self._file_bytes = {}
+        self._last_bytes = 0
+        self._last_time = time.time()
+
+    def bind(self, params):
+        self.params = params
+        params['concurrent_fragment_downloads'] = self.n
+
+    def unbind(self):
+        """Stops writing to the params (call before the YoutubeDL is released)."""
+        self.params = None
+
+    def set_n(self, n):
+        self.n = n
+        if self.params is not None:
+            self.params['concurrent_fragment_downloads'] = n
+
+    def bytes_done(self):
+        return sum(self._file_bytes.values())
+
+    def progress_hook(self, d):
+        filename = d.get('filename')
+        if d.get('status') == 'downloading':
+            self._file_bytes[filename] = d.get('downloaded_bytes') or 0
+        elif d.get('status') == 'finished':
+            self._file_bytes[filename] = d.get('total_bytes') or d.get('downloaded_bytes') or self._file_bytes.get(filename, 0)
+            self.tuner.checkpoint(self)
+
+    def log_hook(self, level, message):
+        if THROTTLE_RE.search(message):
+            self.throttled = True
+
+
+class FragmentTuner:
+    """
+    Adaptive fragment concurrency for HLS/DASH downloads (AIMD per host):
+    add one connection while throughput keeps improving, halve on 429/5xx.
+    per_job_max caps a single download, global_max caps the sum over all
+    running downloads so it fits together with the batch concurrency.
+    """
+
+    def __init__(self, start=4, per_job_max=8, global_max=16, fixed=None):
+        self.start = start
+        self.per_job_max = per_job_max
+        self.global_max = global_max
+        self.fixed = fixed  # a number disables the adaptive part
+        self._level = {}  # host -> current concurrency
+        self._rate = {}   # host -> throughput at the last checkpoint (bytes/s)
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = host_key(url)
+        with self._lock:
+            wanted = self.fixed or self._level.get(host, self.start)
+            n = max(1, min(wanted, self.per_job_max, self.global_max - self._in_use))
+            self._in_use += n
+        return FragmentLease(self, host, n)
+
+    def checkpoint(self, lease):
+        """Measures throughput since the last checkpoint and re-tunes the lease."""
+        rate = self._measure(lease)
+        if rate is None and not lease.throttled:
+            return
+        with self._lock:
+            level = self._adapt(lease.host, rate, lease.throttled)
+            lease.throttled = False
+            if self.fixed:
+                return
+            # Resize within the global budget
+            available = self.global_max - self._in_use + lease.n
+            n = max(1, min(level, self.per_job_max, available))
+            self._in_use += n - lease.n
+        lease.set_n(n)
+
+    def release(self, lease, error=None):
+        """Returns the lease's connections to the global budget, learning from the outcome."""
+        if error and THROTTLE_RE.search(error):
+            lease.throttled = True
+        rate = self._measure(lease)
+        with self._lock:
+            self._in_use -= lease.n
+            if rate is not None or lease.throttled:
+                self._adapt(lease.host, rate, lease.throttled)
+
+    @staticmethod
+    def _measure(lease):
+        now = time.time()
+        elapsed = now - lease._last_time
+        if elapsed < 1:
+            return None
+        done = lease.bytes_done()
+        rate = (done - lease._last_bytes) / elapsed
+        lease._last_bytes, lease._last_time = done, now
+        return rate
+
+    def _adapt(self, host, rate, throttled):
+        # Called with the lock held
+        level = self._level.get(host, self.start)
+        previous = self._rate.get(host)
+        if throttled:
+            level = max(1, level // 2)
+        elif rate is not None and previous is not None:
+            if rate > previous * 1.05:
+                level = min(self.per_job_max, level + 1)
+            elif rate < previous * 0.8:
+                level = max(1, level - 1)
+        elif rate is not None and previous is None:
+            level = min(self.per_job_max, level + 1)
+        if rate is not None:
+            self._rate[host] = rate
+        self._level[host] = level
+        return level
+
+    def set_limits(self, per_job_max=None, global_max=None, fixed=None):
+        with self._lock:
+            if per_job_max is not None:
+                self.per_job_max = max(1, int(per_job_max))
+            if global_max is not None:
+                self.global_max = max(1, int(global_max))
+            self.fixed = fixed
+
+    def stats(self):
+        with self._lock:
+            return {'in_use': self._in_use, 'levels': dict(self._level)}
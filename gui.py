@@ -4,19 +4,34 @@ from tkinter import filedialog, messagebox
 import threading
 import os
 import time
-from PIL import Image, ImageTk
-import urllib.request
-import io
-import requests
+import json
 import webbrowser
 import sys
 from downloader import VideoDownloader
-from config_manager import ConfigManager
+from ydl_pool import load_yt_dlp
+from config_manager import ConfigManager, data_path
+from thumbnail_service import ThumbnailService
+from scheduler import QUEUED, DONE, FAILED
+from task_model import TaskRecord, TaskListModel
+from playlist_selection import PlaylistSelection, SelectionView
+from postprocess_pool import RETRYING
+from audio_profiles import AUDIO_PROFILES, DEFAULT_PROFILE
+from url_utils import extract_urls, clean_url, unique_urls, normalize_url, read_url_file
+from event_bus import PROGRESS
 
 # --- CONFIG & CONSTANTS ---
 CURRENT_VERSION = "2.6.0"
 REPO_OWNER = "thanhlone2k6"
 REPO_NAME = "YTB-DOWNLOAD-VIP"
+PROGRESS_REFRESH_MS = 100 # Repaint progress at 10 Hz whatever the number of downloads
+TASK_ROW_HEIGHT = 104 # Row pitch of the task list (card + padding)
+SPEED_LIMITS_MB = (1, 2, 5, 10, 20, 50)
+IMPORT_STATUS_MS = 8000 # How long the "Added N links" note stays
+# Loaded in a background thread once the window is up, not before it
+WARM_UP_MODULES = ("yt_dlp", "PIL.Image", "requests")
+# Set to a file path to record time-to-first-frame (see benchmarks/startup_bench.py)
+STARTUP_PROFILE_ENV = "DOWNLOADER_STARTUP_PROFILE"
+MODULE_LOADED_AT = time.perf_counter()
 
 # --- THEME CONFIGURATION ---
 ctk.set_appearance_mode("Dark")
@@ -36,137 +51,196 @@ COLORS = {
     "progress": "#3b82f6"      # Progress bar color
 }
 
-class TaskCard(ctk.CTkFrame):
-    def __init__(self, parent, url, download_path, downloader_instance, remove_callback, is_audio=False):
-        super().__init__(parent, fg_color=COLORS["panel"], corner_radius=12, border_width=1, border_color=COLORS["border"])
+class Task:
+    """
+    One download. Drives the scheduler jobs and writes what should be shown
+    into self.record; it owns no widget. A TaskRow paints the record while
+    the task is scrolled into view.
+    """
+
+    def __init__(self, app, url, download_path, downloader_instance, remove_callback, is_audio=False, thumbnails=None, journal_job=None):
+        self.app = app # Tk root: after(), clipboard, dialogs
         self.url = url
         self.download_path = download_path
         self.downloader = downloader_instance
         self.remove_callback = remove_callback
         self.is_audio = is_audio
+        self.thumbnails = thumbnails
+        self.record = TaskRecord(self, title="Fetching metadata...", meta=f"initializing • {url}")
+        # Progress hooks publish (percent, p_str, status, color) here
+        self.progress_slot = self.record
         self.is_downloading = False
         self.stop_event = False # Not fully implemented for yt-dlp stop, but used for logic state
+        self.is_playlist = False
+        self.playlist_title = None
+        self.selected_items_str = None
+        self.info = None
+        self.dialog = None # Playlist dialog being filled in page by page
+        self.dialog_open = False
+
+        # Every task is journaled so it can be resumed after a restart
+        if journal_job:
+            self.journal_id = journal_job['id']
+            self.selected_items_str = journal_job.get('playlist_items')
+        else:
+            self.journal_id = self.downloader.journal.add(url, download_path, format_type='audio' if is_audio else 'video')
 
-        self.setup_ui()
         self.start_processing()
 
-    def setup_ui(self):
-        self.grid_columnconfigure(1, weight=1)
-        
-        # 1. Icon / Thumbnail (Left)
-        # Using a neutral placeholder initially
-        self.thumb_frame = ctk.CTkFrame(self, width=120, height=68, fg_color="black", corner_radius=8)
-        self.thumb_frame.grid(row=0, column=0, rowspan=2, padx=12, pady=12, sticky="ns")
-        self.thumb_frame.grid_propagate(False)
-        
-        self.thumb_label = ctk.CTkLabel(self.thumb_frame, text="", image=None)
-        self.thumb_label.pack(expand=True, fill="both")
-
-        # 2. Info (Title & Meta)
-        self.info_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.info_frame.grid(row=0, column=1, sticky="nsew", padx=(0, 10), pady=(12, 0))
-        
-        self.title_label = ctk.CTkLabel(self.info_frame, text="Fetching metadata...", font=("Segoe UI", 14, "bold"), text_color=COLORS["text"], anchor="w")
-        self.title_label.pack(fill="x")
-        
-        self.meta_label = ctk.CTkLabel(self.info_frame, text=f"initializing • {self.url}", font=("Segoe UI", 12), text_color=COLORS["text_sec"], anchor="w")
-        self.meta_label.pack(fill="x")
-
-        # 3. Status / Speed (Right Top)
-        self.status_label = ctk.CTkLabel(self, text="Waiting...", font=("Segoe UI", 12, "bold"), text_color=COLORS["accent"], anchor="e")
-        self.status_label.grid(row=0, column=2, padx=15, pady=(12, 0), sticky="e")
-
-        # 4. Progress Bar & Controls (Bottom Row)
-        self.progress_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.progress_frame.grid(row=1, column=1, columnspan=2, sticky="ew", padx=(0, 15), pady=(5, 12))
-        
-        self.progress_bar = ctk.CTkProgressBar(self.progress_frame, height=8, corner_radius=4, progress_color=COLORS["progress"])
-        self.progress_bar.pack(side="left", fill="x", expand=True, padx=(0, 10))
-        self.progress_bar.set(0)
-        
-        self.percent_label = ctk.CTkLabel(self.progress_frame, text="0%", font=("Segoe UI", 12), text_color=COLORS["text"], width=40)
-        self.percent_label.pack(side="left")
-
-        # Controls
-        self.btn_copy = ctk.CTkButton(self.progress_frame, text="📋", width=30, height=30, fg_color="transparent", hover_color=COLORS["border"], command=self.copy_link)
-        self.btn_copy.pack(side="left", padx=2)
-        
-        self.btn_open = ctk.CTkButton(self.progress_frame, text="📂", width=30, height=30, fg_color="transparent", hover_color=COLORS["border"], command=self.open_folder)
-        self.btn_open.pack(side="left", padx=2)
-        
-        self.btn_del = ctk.CTkButton(self.progress_frame, text="🗑", width=30, height=30, fg_color="transparent", hover_color=COLORS["danger"], command=self.on_delete)
-        self.btn_del.pack(side="left", padx=2)
-
     def start_processing(self):
-        threading.Thread(target=self._download_task, daemon=True).start()
+        # Queued in the shared scheduler instead of one thread per task
+        self.job = self.downloader.scheduler.submit(self._download_task, url=self.url, on_state=self._on_job_state, prefetch=True)
+
+    def _on_job_state(self, job):
+        if job.state == QUEUED:
+            self.progress_slot.publish((None, None, "Queued", COLORS["text_sec"]))
 
     def _download_task(self):
         # Step 1: Get Info (and update UI)
         if self.stop_event: return
 
-        self.title_label.configure(text="Getting info...")
+        # Already in the download archive: done without touching the network
+        archived = self.downloader.find_archived(self.url)
+        if archived:
+            self.record.update(title=os.path.basename(archived['path'] or self.url),
+                               meta=f"Already downloaded • {archived['path'] or archived['archive_id']}")
+            self.progress_slot.publish((1, "100%", "Skipped", COLORS["success"]))
+            self.downloader.journal.set_status(self.journal_id, DONE)
+            return
+
+        self.record.update(title="Getting info...")
+        self.progress_slot.publish((None, None, "Waiting...", COLORS["accent"]))
         try:
-             info = self.downloader.get_video_info(self.url)
+             # Playlists come back without entries, their pages follow from the feed
+             feed = self.downloader.stream_info(self.url)
+             info = next(feed)
              if self.stop_event: return # Check stop again
 
              if 'error' in info:
-                 self.status_label.configure(text="Error", text_color=COLORS["danger"])
-                 self.meta_label.configure(text=str(info['error']))
+                 self.record.update(meta=str(info['error']))
+                 self.progress_slot.publish((None, None, "Error", COLORS["danger"]))
+                 self.downloader.journal.set_status(self.journal_id, FAILED, error=str(info['error']))
                  return
-             
+             # Handed to download_video so the page is only extracted once
+             self.info = info
+
              # Update Metadata
              title = info.get('title', 'Unknown Title')
              platform = info.get('extractor_key', 'Web')
-             
-             self.after(0, lambda: self.title_label.configure(text=title))
-             self.after(0, lambda: self.meta_label.configure(text=f"{platform} • Best Quality"))
-             
+             self.record.update(title=title, meta=f"{platform} • Best Quality")
+
              # Load Thumbnail
              thumb_url = info.get('thumbnail')
              if thumb_url:
-                 self._load_thumbnail(thumb_url)
-                 
+                 self._load_thumbnail(thumb_url, key=f"{platform}:{info.get('id')}" if info.get('id') else None)
+
              # Check if playlist
-             self.is_playlist = False
-             self.playlist_title = None
              playlist_entries = None
-             
+
              if info.get('_type') == 'playlist' or 'entries' in info:
                  self.is_playlist = True
                  self.playlist_title = info.get('title', 'Unknown Playlist')
+                 if 'entries' not in info:
+                     if self._stream_playlist(info, feed):
+                         return
+                     info = self.info
                  playlist_entries = list(info.get('entries', []))
-                 self.after(0, lambda: self.meta_label.configure(text=f"Playlist • {len(playlist_entries)} Videos"))
-
-             # Playlist Selection
-             self.selected_items_str = None
-             if self.is_playlist and playlist_entries:
-                 self.after(0, lambda: self.status_label.configure(text="Waiting for selection..."))
-                 
-                 selection_event = threading.Event()
-                 
-                 def on_selected(items_str):
-                     self.selected_items_str = items_str
-                     selection_event.set()
-                 
-                 # Show dialog on main thread
-                 self.after(0, lambda: PlaylistSelectionDialog(self, playlist_entries, on_selected))
-                 
-                 # Wait
-                 selection_event.wait()
-                 
-                 if not self.selected_items_str:
-                     # User closed/cancelled - Stop task
-                     self.after(0, lambda: self.status_label.configure(text="Cancelled"))
-                     return
+                 self.record.update(meta=f"Playlist • {len(playlist_entries)} Videos")
+             else:
+                 feed.close()
+
+             # Playlist Selection (a resumed job already has one)
+             if self.is_playlist and playlist_entries and not self.selected_items_str:
+                 self.progress_slot.publish((None, None, "Waiting for selection...", None))
+                 # The worker slot is released while the dialog is open,
+                 # the download is queued again once the user confirms.
+                 # Entries already in the archive start unchecked
+                 archived_indices = {i for i, entry in enumerate(playlist_entries, 1) if self.downloader.archive.contains_entry(entry)}
+                 self.app.after(0, lambda: PlaylistSelectionDialog(self.app, playlist_entries, self._on_playlist_selected, archived=archived_indices))
+                 return
 
         except Exception as e:
             print(f"Metadata error: {e}")
             if "Stopped by user" in str(e): return
             if not self.is_playlist: # Don't error out if cancelled playlist
-                 self.after(0, lambda: self.status_label.configure(text="Error"))
+                 self.progress_slot.publish((None, None, "Error", None))
+
+        self._start_download()
+
+    def _stream_playlist(self, head, feed):
+        """
+        Reads the playlist pages from feed into self.info. Without a resumed
+        selection the dialog opens right away and fills in page by page;
+        confirming early downloads the selected entries and stops paging.
+        Returns True when the dialog took over (or the task was stopped).
+        """
+        entries = []
+        self.info = dict(head, entries=entries)
+        use_dialog = not self.selected_items_str
+        if use_dialog:
+            self.progress_slot.publish((None, None, "Waiting for selection...", None))
+            self.dialog_open = True
+            self.app.after(0, self._open_dialog)
+
+        for page in feed:
+            if isinstance(page, dict):
+                print(f"Playlist paging error: {page.get('error')}")
+                break
+            start = len(entries)
+            entries.extend(page)
+            self.record.update(meta=f"Playlist • {len(entries)} Videos (loading...)")
+            if use_dialog:
+                # Entries already in the archive start unchecked
+                archived = {i for i, entry in enumerate(page, start + 1) if self.downloader.archive.contains_entry(entry)}
+                self.app.after(0, lambda p=page, a=archived: self._dialog_add(p, a))
+            if self.stop_event or (use_dialog and not self.dialog_open):
+                feed.close()
+                return True
+
+        self.record.update(meta=f"Playlist • {len(entries)} Videos")
+        if use_dialog:
+            self.app.after(0, self._dialog_done)
+        return use_dialog
+
+    def _open_dialog(self):
+        self.dialog = PlaylistSelectionDialog(self.app, [], self._on_playlist_selected, loading=True)
+
+    def _dialog_add(self, page, archived):
+        dialog = self.dialog
+        if dialog is not None and dialog.winfo_exists():
+            dialog.add_entries(page, archived)
+
+    def _dialog_done(self):
+        dialog = self.dialog
+        if dialog is not None and dialog.winfo_exists():
+            dialog.loading_done()
+
+    def _on_playlist_selected(self, items_str):
+        # Stops the paging of a streamed playlist
+        self.dialog_open = False
+        self.dialog = None
+        if self.info and 'entries' in self.info:
+            self.info = dict(self.info, entries=list(self.info['entries']))
+        if self.stop_event: return
+        if not items_str:
+            # User closed/cancelled - Stop task
+            self.progress_slot.publish((None, None, "Cancelled", None))
+            self.downloader.journal.cancel(self.journal_id)
+            return
+        self.selected_items_str = items_str
+        if items_str.endswith(":"):
+            # Includes entries that were never loaded: extract the whole playlist again
+            self.info = None
+        self.downloader.journal.update(self.journal_id, playlist_title=self.playlist_title, playlist_items=items_str)
+        # Already waited once in the queue, so run ahead of new tasks
+        self.job = self.downloader.scheduler.submit(self._start_download, url=self.url, priority=1, on_state=self._on_job_state)
+
+
+    def _start_download(self):
+        if self.stop_event: return
         # Step 2: Start Download
         self.is_downloading = True
-        self.after(0, lambda: self.status_label.configure(text="Downloading..."))
+        self.progress_slot.publish((None, None, "Downloading...", None))
         
         def progress_hook(d):
             if self.stop_event:
@@ -205,43 +279,46 @@ class TaskCard(ctk.CTkFrame):
                     if p_index and p_count:
                         prefix = f"[{p_index}/{p_count}] "
 
-                    self.after(0, lambda: self.progress_bar.set(percent_val))
-                    self.after(0, lambda: self.percent_label.configure(text=p_str))
-                    self.after(0, lambda: self.status_label.configure(text=f"{prefix}{speed_str} • {total_str}"))
+                    # Only the latest state is kept, the App timer paints it
+                    self.progress_slot.publish((percent_val, p_str, f"{prefix}{speed_str} • {total_str}", None))
                 except Exception as e:
                     print(f"Hook Error: {e}")
             elif d['status'] == 'finished':
                 # Only indicate full completion if not a playlist (playlist handles individual completions)
                 # But here we just update 100% for the current file
-                self.after(0, lambda: self.progress_bar.set(1))
-                self.after(0, lambda: self.percent_label.configure(text="100%"))
-                self.after(0, lambda: self.status_label.configure(text="Completed", text_color=COLORS["success"]))
+                self.progress_slot.publish((1, "100%", "Completed", COLORS["success"]))
+
+        def stage_hook(stage, **details):
+            if stage == RETRYING:
+                self.progress_slot.publish((None, None, f"Retrying ({details.get('reason')}, #{details.get('attempt')})...", COLORS["text_sec"]))
+            else:
+                # Network part done, ffmpeg still working on the post-processing pool
+                self.progress_slot.publish((1, "100%", "Converting...", COLORS["accent"]))
 
         fmt = 'audio' if self.is_audio else 'video'
-        success, msg = self.downloader.download_video(self.url, self.download_path, format_type=fmt, progress_hook=progress_hook, playlist_name=self.playlist_title, playlist_items=getattr(self, 'selected_items_str', None))
+        success, msg = self.downloader.download_video(self.url, self.download_path, format_type=fmt, progress_hook=progress_hook, playlist_name=self.playlist_title, playlist_items=getattr(self, 'selected_items_str', None), info=getattr(self, 'info', None), job_id=self.journal_id, stage_hook=stage_hook, is_cancelled=lambda: self.stop_event)
         
         self.is_downloading = False
-        if not success:
+        if success:
+             self.progress_slot.publish((1, "100%", "Completed", COLORS["success"]))
+        else:
              state_text = "Stopped" if "Stopped by user" in str(msg) else "Failed"
              state_color = COLORS["text_sec"] if state_text == "Stopped" else COLORS["danger"]
-             self.after(0, lambda: self.status_label.configure(text=state_text, text_color=state_color))
+             # Through the slot too, so a late progress tick can't paint over it
+             self.progress_slot.publish((None, None, state_text, state_color))
              if state_text != "Stopped":
-                 self.after(0, lambda: self.meta_label.configure(text=msg))
+                 self.record.update(meta=msg)
 
-    def _load_thumbnail(self, url):
-        try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req) as response:
-                data = response.read()
-            img = Image.open(io.BytesIO(data))
-            # Resize
-            img.thumbnail((120, 68))
-            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(120, 68))
-            
-            self.img_ref = ctk_img # Keep reference
-            self.after(0, lambda: self.thumb_label.configure(image=ctk_img))
-        except:
-            pass
+    def _load_thumbnail(self, url, key=None):
+        if not self.thumbnails:
+            return
+        # Fetch and decode happen on the service's workers, only the CTkImage is built on Tk
+        self.thumbnails.fetch(url, lambda img: self.app.after(0, lambda: self._set_thumbnail(img)), key=key)
+
+    def _set_thumbnail(self, img):
+        if img is None or self.stop_event:
+            return
+        self.record.update(thumb=ctk.CTkImage(light_image=img, dark_image=img, size=(120, 68)))
 
     def open_folder(self):
         if os.path.exists(self.download_path):
@@ -249,33 +326,276 @@ class TaskCard(ctk.CTkFrame):
 
     def copy_link(self):
         try:
-            self.clipboard_clear()
-            self.clipboard_append(self.url)
-            self.status_label.configure(text="Copied!", text_color=COLORS["accent"])
-            self.after(2000, lambda: self.status_label.configure(text="Waiting...", text_color=COLORS["text"]))
+            self.app.clipboard_clear()
+            self.app.clipboard_append(self.url)
+            self.progress_slot.publish((None, None, "Copied!", COLORS["accent"]))
+            self.app.after(2000, lambda: self.progress_slot.publish((None, None, "Waiting...", COLORS["text"])))
         except:
              pass
 
     def on_delete(self):
         self.stop_event = True
+        self.downloader.journal.cancel(self.journal_id)
+        job = getattr(self, 'job', None)
+        if job:
+            job.cancel()
         if self.remove_callback:
             self.remove_callback(self)
-        self.destroy()
+
+
+class TaskRow(ctk.CTkFrame):
+    """Widgets for one visible task. Recycled by VirtualList while scrolling."""
+
+    def __init__(self, parent):
+        # Transparent holder so rows keep the old 5px gap between cards
+        super().__init__(parent, fg_color="transparent")
+        self.card = ctk.CTkFrame(self, fg_color=COLORS["panel"], corner_radius=12, border_width=1, border_color=COLORS["border"])
+        self.card.pack(fill="both", expand=True, pady=5)
+        self.record = None
+        self.painted_version = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        card = self.card
+        card.grid_columnconfigure(1, weight=1)
+
+        # 1. Icon / Thumbnail (Left)
+        # Using a neutral placeholder initially
+        self.thumb_frame = ctk.CTkFrame(card, width=120, height=68, fg_color="black", corner_radius=8)
+        self.thumb_frame.grid(row=0, column=0, rowspan=2, padx=12, pady=12, sticky="ns")
+        self.thumb_frame.grid_propagate(False)
+
+        self.thumb_label = ctk.CTkLabel(self.thumb_frame, text="", image=None)
+        self.thumb_label.pack(expand=True, fill="both")
+
+        # 2. Info (Title & Meta)
+        self.info_frame = ctk.CTkFrame(card, fg_color="transparent")
+        self.info_frame.grid(row=0, column=1, sticky="nsew", padx=(0, 10), pady=(12, 0))
+
+        self.title_label = ctk.CTkLabel(self.info_frame, text="", font=("Segoe UI", 14, "bold"), text_color=COLORS["text"], anchor="w")
+        self.title_label.pack(fill="x")
+
+        self.meta_label = ctk.CTkLabel(self.info_frame, text="", font=("Segoe UI", 12), text_color=COLORS["text_sec"], anchor="w")
+        self.meta_label.pack(fill="x")
+
+        # 3. Status / Speed (Right Top)
+        self.status_label = ctk.CTkLabel(card, text="", font=("Segoe UI", 12, "bold"), text_color=COLORS["accent"], anchor="e")
+        self.status_label.grid(row=0, column=2, padx=15, pady=(12, 0), sticky="e")
+
+        # 4. Progress Bar & Controls (Bottom Row)
+        self.progress_frame = ctk.CTkFrame(card, fg_color="transparent")
+        self.progress_frame.grid(row=1, column=1, columnspan=2, sticky="ew", padx=(0, 15), pady=(5, 12))
+
+        self.progress_bar = ctk.CTkProgressBar(self.progress_frame, height=8, corner_radius=4, progress_color=COLORS["progress"])
+        self.progress_bar.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.progress_bar.set(0)
+
+        self.percent_label = ctk.CTkLabel(self.progress_frame, text="0%", font=("Segoe UI", 12), text_color=COLORS["text"], width=40)
+        self.percent_label.pack(side="left")
+
+        # Controls, forwarded to whichever task the row shows
+        self.btn_copy = ctk.CTkButton(self.progress_frame, text="📋", width=30, height=30, fg_color="transparent", hover_color=COLORS["border"], command=lambda: self._forward('copy_link'))
+        self.btn_copy.pack(side="left", padx=2)
+
+        self.btn_open = ctk.CTkButton(self.progress_frame, text="📂", width=30, height=30, fg_color="transparent", hover_color=COLORS["border"], command=lambda: self._forward('open_folder'))
+        self.btn_open.pack(side="left", padx=2)
+
+        self.btn_del = ctk.CTkButton(self.progress_frame, text="🗑", width=30, height=30, fg_color="transparent", hover_color=COLORS["danger"], command=lambda: self._forward('on_delete'))
+        self.btn_del.pack(side="left", padx=2)
+
+    def _forward(self, action):
+        if self.record is not None:
+            getattr(self.record.task, action)()
+
+    def show(self, record, force=False):
+        """Paints record if it is new to this row or changed since the last paint."""
+        if record is self.record and record.version == self.painted_version and not force:
+            return
+        self.record = record
+        self.painted_version = record.version
+        self.title_label.configure(text=record.title)
+        self.meta_label.configure(text=record.meta)
+        self.status_label.configure(text=record.status, text_color=record.status_color or COLORS["accent"])
+        self.progress_bar.set(record.percent)
+        self.percent_label.configure(text=record.percent_text)
+        self.thumb_label.configure(image=record.thumb)
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only has widgets for the rows in view.
+    model needs len() and window(first, count); make_row(parent) builds a
+    row widget with show(item, force). Scrolling re-binds the same rows to
+    other items, so thousands of items cost no more widgets than a screenful.
+    """
+
+    # Lists alive right now. The wheel is bound once app-wide and routed to
+    # the list under the pointer, so destroyed lists leave no handlers behind.
+    _wheel_lists = []
+    _wheel_bound = False
+
+    def __init__(self, parent, model, make_row, row_height, **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+        self.model = model
+        self.make_row = make_row
+        self.row_height = row_height
+        self.offset = 0 # Pixels scrolled from the top
+        self.rows = []
+        self._shown = 0
+        self._layout = None
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", lambda e: self.refresh())
+        VirtualList._wheel_lists.append(self)
+        if not VirtualList._wheel_bound:
+            VirtualList._wheel_bound = True
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.bind_all(sequence, VirtualList._route_wheel, add="+")
+
+    def destroy(self):
+        if self in VirtualList._wheel_lists:
+            VirtualList._wheel_lists.remove(self)
+        super().destroy()
+
+    def _ensure_rows(self, height):
+        needed = height // self.row_height + 2
+        while len(self.rows) < needed:
+            self.rows.append(self.make_row(self.body))
+        while len(self.rows) > needed:
+            self.rows.pop().destroy()
+        self._shown = min(self._shown, len(self.rows))
+
+    def refresh(self, force=False):
+        """Places rows for the current scroll position and repaints the changed ones. Cheap when nothing moved."""
+        height = max(self.body.winfo_height(), self.row_height)
+        total = len(self.model) * self.row_height
+        self.offset = max(0, min(self.offset, total - height))
+        first = int(self.offset // self.row_height)
+        shift = int(self.offset - first * self.row_height)
+
+        layout = (first, shift, height, len(self.model))
+        moved = force or layout != self._layout
+        if moved:
+            self._layout = layout
+            self._ensure_rows(height)
+            if total > height:
+                self.scrollbar.set(self.offset / total, (self.offset + height) / total)
+            else:
+                self.scrollbar.set(0, 1)
+
+        items = self.model.window(first, len(self.rows))
+        for i, row in enumerate(self.rows):
+            if i < len(items):
+                row.show(items[i], force)
+                if moved:
+                    row.place(x=0, y=i * self.row_height - shift, relwidth=1, height=self.row_height)
+            elif i < self._shown:
+                row.place_forget()
+        self._shown = len(items)
+
+    def scroll_to(self, offset):
+        self.offset = offset
+        self.refresh()
+
+    def on_inserted_at_top(self, count=1):
+        # Keep what the user is looking at in place
+        if self.offset > 0:
+            self.offset += self.row_height * count
+        self.refresh()
+
+    def yview(self, *args):
+        height = max(self.body.winfo_height(), self.row_height)
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.model) * self.row_height)
+        elif args[0] == "scroll":
+            step = self.row_height if args[2] == "units" else height
+            self.scroll_to(self.offset + int(args[1]) * step)
+
+    @staticmethod
+    def _route_wheel(event):
+        # Only the list under the pointer scrolls
+        widget = str(event.widget)
+        for virtual_list in list(VirtualList._wheel_lists):
+            path = str(virtual_list)
+            if widget == path or widget.startswith(path + "."):
+                virtual_list._on_wheel(event)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            direction = -1
+        else:
+            direction = 1
+        self.scroll_to(self.offset + direction * max(self.row_height // 2, 30))
 
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, started_at=None):
         super().__init__()
+        self.started_at = started_at or MODULE_LOADED_AT
         
         self.title("Downloader Pro")
         self.geometry("1100x700")
         self.configure(fg_color=COLORS["bg"])
         
         self.config = ConfigManager()
-        self.downloader = VideoDownloader()
+        self.downloader = VideoDownloader(self.config)
+        self.queue_dirty = False
+        self.downloader.scheduler.add_listener(self.on_job_state)
+        # Progress of every download, drained by the repaint timer (latest event per job only)
+        self.event_poller = self.downloader.events.poller()
+        self.job_speeds = {}
+        self.total_speed_text = ""
+        self.thumbnails = ThumbnailService(data_path("thumb_cache"))
+        self.downloader.prefetcher.add_listener(self.on_prefetched)
+        self.task_model = TaskListModel()
+        self.task_keys = set() # normalize_url keys of the tasks in the list, for dedupe
 
         self.setup_layout()
         self.load_settings()
+        self.after(PROGRESS_REFRESH_MS, self.repaint_progress)
+        self.after(0, self.on_first_frame)
+
+    def on_first_frame(self):
+        # Runs on the first mainloop turn, flush pending draws so the window is really painted
+        self.update_idletasks()
+        first_frame = time.perf_counter() - self.started_at
+        heavy = {name: name in sys.modules for name in WARM_UP_MODULES}
+        threading.Thread(target=self.warm_up, daemon=True).start()
+
+        profile_path = os.environ.get(STARTUP_PROFILE_ENV)
+        if not profile_path:
+            self.resume_jobs()
+        else:
+            # Profiling run: never start the user's journaled downloads
+            try:
+                with open(profile_path, "w", encoding="utf-8") as f:
+                    json.dump({"time_to_first_frame": first_frame, "loaded_before_first_frame": heavy}, f)
+            except Exception as e:
+                print(f"Startup profile error: {e}")
+            self.after(100, self.destroy)
+
+    def resume_jobs(self):
+        # Rehydrate tasks left queued/running by the previous session
+        journal = self.downloader.journal
+        journal.prune()
+        for job in journal.pending():
+            self.add_task(job['url'], journal_job=job)
+
+    def warm_up(self):
+        # Import heavy modules off the Tk thread so the first task doesn't pay for them
+        for name in WARM_UP_MODULES:
+            try:
+                if name == "yt_dlp":
+                    # Jobs may be importing it already, see load_yt_dlp
+                    load_yt_dlp()
+                else:
+                    __import__(name)
+            except Exception as e:
+                print(f"Warm-up import of {name} failed: {e}")
 
     def setup_layout(self):
         self.grid_columnconfigure(1, weight=1)
@@ -297,6 +617,32 @@ class App(ctk.CTk):
         self.menu_btn_downloads = self.create_sidebar_btn("Downloads", True)
         self.menu_btn_downloads.pack(fill="x", padx=10, pady=5)
 
+        # Parallel downloads (scheduler worker count)
+        self.lbl_parallel = ctk.CTkLabel(self.sidebar, text="Parallel downloads", font=("Segoe UI", 12), text_color=COLORS["text_sec"])
+        self.lbl_parallel.pack(padx=20, pady=(20, 0), anchor="w")
+        self.parallel_var = ctk.StringVar(value=str(self.downloader.scheduler.max_workers))
+        self.opt_parallel = ctk.CTkOptionMenu(self.sidebar, values=[str(n) for n in (1, 2, 3, 4, 6, 8)], variable=self.parallel_var,
+                                              fg_color=COLORS["border"], button_color=COLORS["border"], command=self.on_parallel_change)
+        self.opt_parallel.pack(fill="x", padx=20, pady=5)
+
+        # Audio mode output (see audio_profiles)
+        self.lbl_audio_profile = ctk.CTkLabel(self.sidebar, text="Audio format", font=("Segoe UI", 12), text_color=COLORS["text_sec"])
+        self.lbl_audio_profile.pack(padx=20, pady=(10, 0), anchor="w")
+        current_profile = AUDIO_PROFILES.get(self.config.get("audio_profile")) or AUDIO_PROFILES[DEFAULT_PROFILE]
+        self.audio_profile_var = ctk.StringVar(value=current_profile['label'])
+        self.opt_audio_profile = ctk.CTkOptionMenu(self.sidebar, values=[p['label'] for p in AUDIO_PROFILES.values()], variable=self.audio_profile_var,
+                                                   fg_color=COLORS["border"], button_color=COLORS["border"], command=self.on_audio_profile_change)
+        self.opt_audio_profile.pack(fill="x", padx=20, pady=5)
+
+        # Total bandwidth cap, shared fairly by the running downloads
+        self.lbl_speed_limit = ctk.CTkLabel(self.sidebar, text="Speed limit", font=("Segoe UI", 12), text_color=COLORS["text_sec"])
+        self.lbl_speed_limit.pack(padx=20, pady=(10, 0), anchor="w")
+        limit_kbps = int(self.config.get("bandwidth_limit_kbps") or 0)
+        self.speed_limit_var = ctk.StringVar(value=f"{limit_kbps // 1024} MB/s" if limit_kbps else "Unlimited")
+        self.opt_speed_limit = ctk.CTkOptionMenu(self.sidebar, values=["Unlimited"] + [f"{n} MB/s" for n in SPEED_LIMITS_MB], variable=self.speed_limit_var,
+                                                 fg_color=COLORS["border"], button_color=COLORS["border"], command=self.on_speed_limit_change)
+        self.opt_speed_limit.pack(fill="x", padx=20, pady=5)
+
         # Version & Update
         self.lbl_version = ctk.CTkLabel(self.sidebar, text=f"Version: {CURRENT_VERSION}", font=("Segoe UI", 12), text_color=COLORS["text_sec"])
         self.lbl_version.pack(side="bottom", pady=(5, 20))
@@ -305,6 +651,12 @@ class App(ctk.CTk):
                                               anchor="center", height=30, font=("Segoe UI", 12), command=self.manual_check_update)
         self.btn_check_update.pack(side="bottom", fill="x", padx=20, pady=5)
 
+        # Per-job timings and throughput (downloader.telemetry)
+        self.btn_stats = ctk.CTkButton(self.sidebar, text="📊 Statistics", fg_color="transparent", hover_color=COLORS["border"],
+                                       anchor="center", height=30, font=("Segoe UI", 12), command=self.open_stats)
+        self.btn_stats.pack(side="bottom", fill="x", padx=20, pady=5)
+        self.stats_panel = None
+
         # --- MAIN CONTENT AREA ---
         self.main_area = ctk.CTkFrame(self, fg_color="transparent")
         self.main_area.grid(row=0, column=1, sticky="nsew", padx=30, pady=30)
@@ -328,6 +680,10 @@ class App(ctk.CTk):
         self.btn_paste = ctk.CTkButton(self.url_frame, text="PASTE", width=80, fg_color=COLORS["accent"], hover_color=COLORS["accent_hover"], command=self.paste_from_clipboard)
         self.btn_paste.pack(side="right", padx=10, pady=10)
 
+        # Bulk import from a .txt/.csv file
+        self.btn_import = ctk.CTkButton(self.url_frame, text="📄", width=40, fg_color=COLORS["border"], hover_color=COLORS["accent_hover"], command=self.import_file)
+        self.btn_import.pack(side="right", pady=10)
+
         # Save Location Row (Under input as requested)
         self.path_frame = ctk.CTkFrame(self.input_frame, fg_color="transparent")
         self.path_frame.pack(fill="x")
@@ -342,16 +698,20 @@ class App(ctk.CTk):
         
         # Audio Only Checkbox
         self.audio_only_var = ctk.BooleanVar(value=False)
-        self.chk_audio = ctk.CTkCheckBox(self.path_frame, text="Chỉ tải MP3", variable=self.audio_only_var, font=("Segoe UI", 12), text_color=COLORS["text"])
+        self.chk_audio = ctk.CTkCheckBox(self.path_frame, text=self.audio_only_text(), variable=self.audio_only_var, font=("Segoe UI", 12), text_color=COLORS["text"])
         self.chk_audio.pack(side="left", padx=(20, 0))
 
+        self.lbl_import = ctk.CTkLabel(self.path_frame, text="", font=("Segoe UI", 12), text_color=COLORS["text_sec"])
+        self.lbl_import.pack(side="left", padx=(20, 0))
+        self._import_status_job = None
+
         # 2. Section Title
         self.lbl_section = ctk.CTkLabel(self.main_area, text="Downloading", font=("Segoe UI", 18, "bold"), text_color=COLORS["text"], anchor="w")
         self.lbl_section.grid(row=1, column=0, sticky="w", pady=(10, 15))
 
-        # 3. Task List (Scrollable)
-        self.tasks_scroll = ctk.CTkScrollableFrame(self.main_area, fg_color="transparent", label_text="")
-        self.tasks_scroll.grid(row=2, column=0, sticky="nsew")
+        # 3. Task List (virtualized, only visible rows have widgets)
+        self.task_list = VirtualList(self.main_area, self.task_model, TaskRow, TASK_ROW_HEIGHT)
+        self.task_list.grid(row=2, column=0, sticky="nsew")
 
     def create_sidebar_btn(self, text, is_active):
         color = COLORS["accent"] if is_active else "transparent"
@@ -375,68 +735,222 @@ class App(ctk.CTk):
     def paste_from_clipboard(self):
         try:
             content = self.clipboard_get()
-            self.url_entry.delete(0, 'end')
-            self.url_entry.insert(0, content)
-            self.add_task(content)
-        except:
-            pass
+        except tk.TclError:
+            return
+        self.import_text(content)
 
     def on_paste(self, event):
+        try:
+            content = self.clipboard_get()
+        except tk.TclError:
+            return
+        if len(extract_urls(content)) > 1:
+            # A list of links: import it without pasting it into the entry
+            self.import_text(content)
+            return "break"
         # Allow default paste to happen, then trigger add
         # We need a slight delay to let the entry update
         self.after(50, self.check_entry_and_add)
 
     def check_entry_and_add(self):
-        url = self.url_entry.get().strip()
-        if url:
-             self.add_task(url)
+        text = self.url_entry.get().strip()
+        if text:
+            self.import_text(text)
 
     def add_task_event(self, event):
-        url = self.url_entry.get().strip()
-        if url:
-            self.add_task(url)
+        self.check_entry_and_add()
+
+    def import_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Link lists", "*.txt *.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            urls = read_url_file(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Cannot read {os.path.basename(path)}: {e}")
+            return
+        self._import_urls(urls)
+
+    def import_text(self, text):
+        """Adds every link found in text (pasted list, chat message, CSV...)."""
+        urls = extract_urls(text)
+        if not urls:
+            return
+        self.url_entry.delete(0, 'end')
+        if len(urls) == 1:
+            # A single link is always shown, even when already downloaded (the task says so)
+            self.add_task(clean_url(urls[0]))
+        else:
+            self._import_urls(urls)
+
+    def _import_urls(self, urls):
+        # Dedupe against the list right away, so a burst of pastes can't race the background check
+        new, duplicates = unique_urls(urls, self.task_keys)
+        if not new:
+            self.show_import_status(f"No new links ({duplicates} already in the list)")
+            return
+        save_path = self.path_entry.get()
+        format_type = 'audio' if self.audio_only_var.get() else 'video'
+        self.show_import_status(f"Importing {len(new)} links...")
+        threading.Thread(target=self._import_worker, args=(new, duplicates, save_path, format_type), daemon=True).start()
 
-    def add_task(self, url):
+    def _import_worker(self, urls, duplicates, save_path, format_type):
+        # Off the Tk thread: history lookups and the journal insert for the whole batch
+        try:
+            history = {normalize_url(url) for url in self.downloader.journal.finished_urls()}
+            fresh, done = [], []
+            for url in urls:
+                if normalize_url(url) in history or self.downloader.find_archived(url):
+                    done.append(url)
+                else:
+                    fresh.append(url)
+            ids = self.downloader.journal.add_many(fresh, save_path, format_type=format_type) if fresh else []
+        except Exception as e:
+            print(f"Import error: {e}")
+            msg = f"Import failed: {e}"
+            self.after(0, lambda: self.release_keys(urls, msg))
+            return
+        self.after(0, lambda: self.add_tasks(fresh, ids, save_path, format_type == 'audio', duplicates, done))
+
+    def release_keys(self, urls, status=None):
+        # Links reserved by _import_urls that got no task after all
+        for url in urls:
+            self.task_keys.discard(normalize_url(url))
+        if status:
+            self.show_import_status(status)
+
+    def add_tasks(self, urls, journal_ids, save_path, is_audio, duplicates=0, done=()):
+        """
+        Adds a batch of already journaled links with a single list refresh.
+        done: links skipped as already downloaded, their keys are released.
+        """
+        self.release_keys(done)
+        if urls and not os.path.exists(save_path):
+            try:
+                os.makedirs(save_path)
+            except OSError:
+                self.release_keys(urls)
+                for journal_id in journal_ids:
+                    self.downloader.journal.cancel(journal_id)
+                messagebox.showerror("Error", "Invalid download path")
+                return
+        for url, journal_id in zip(urls, journal_ids):
+            task = Task(self, url, save_path, self.downloader, self.remove_task, is_audio=is_audio,
+                        thumbnails=self.thumbnails, journal_job={'id': journal_id, 'playlist_items': None})
+            self.task_model.add(task.record)
+        self.task_list.on_inserted_at_top(len(urls))
+        skipped = []
+        if duplicates:
+            skipped.append(f"{duplicates} duplicates")
+        if done:
+            skipped.append(f"{len(done)} already downloaded")
+        self.show_import_status(f"Added {len(urls)} links" + (f" ({', '.join(skipped)} skipped)" if skipped else ""))
+
+    def show_import_status(self, text):
+        self.lbl_import.configure(text=text)
+        if self._import_status_job:
+            self.after_cancel(self._import_status_job)
+        self._import_status_job = self.after(IMPORT_STATUS_MS, lambda: self.lbl_import.configure(text=""))
+
+    def add_task(self, url, journal_job=None):
         # Validate simple URL
         if not url.startswith("http"):
             return # Ignore non-links
 
-        save_path = self.path_entry.get()
+        key = normalize_url(url)
+        if key in self.task_keys and not journal_job:
+            self.url_entry.delete(0, 'end')
+            self.show_import_status("Already in the list")
+            return
+
+        # Resumed jobs keep the folder and mode they were started with
+        save_path = journal_job['output_path'] if journal_job else self.path_entry.get()
         if not os.path.exists(save_path):
             try:
                 os.makedirs(save_path)
             except:
                 messagebox.showerror("Error", "Invalid download path")
                 return
+        self.task_keys.add(key)
 
         # Clear input if auto-add logic
-        self.url_entry.delete(0, 'end')
+        if not journal_job:
+            self.url_entry.delete(0, 'end')
 
-        # Create Task Card
-        is_audio = self.audio_only_var.get()
-        card = TaskCard(self.tasks_scroll, url, save_path, self.downloader, self.remove_task, is_audio=is_audio)
-        
-        # Insert at TOP logic
-        children = self.tasks_scroll.winfo_children()
-        
-        # Since 'card' is already created as a child, it is technically last in list internally
-        # But we can repack it.
-        # However, winfo_children includes the new card? 
-        # Actually in CTkScrollableFrame, we pack into self.tasks_scroll (which is a frame).
-        
-        child_widgets = [c for c in self.tasks_scroll.winfo_children() if isinstance(c, TaskCard) and c != card]
-        
-        if child_widgets:
-            # Pack before the first current card
-            card.pack(before=child_widgets[0], fill="x", pady=5)
-        else:
-            card.pack(fill="x", pady=5)
-        
-        # Update section title count?
-        # self.lbl_section.configure(text=f"Downloading ({len(self.tasks_scroll.winfo_children())})")
+        is_audio = journal_job['format_type'] == 'audio' if journal_job else self.audio_only_var.get()
+        task = Task(self, url, save_path, self.downloader, self.remove_task, is_audio=is_audio,
+                    thumbnails=self.thumbnails, journal_job=journal_job)
+        self.task_model.add(task.record)
+        self.task_list.on_inserted_at_top()
+
+    def remove_task(self, task):
+        self.task_keys.discard(normalize_url(task.url))
+        self.task_model.remove(task.record)
+        self.task_list.refresh(force=True)
 
-    def remove_task(self, task_widget):
-        task_widget.destroy()
+    def repaint_progress(self):
+        # Single timer for all tasks: only the visible rows whose record changed are painted
+        try:
+            self.task_list.refresh()
+        except Exception as e:
+            print(f"Repaint error: {e}")
+        self.drain_events()
+        if self.queue_dirty:
+            self.queue_dirty = False
+            self.update_queue_summary()
+        self.after(PROGRESS_REFRESH_MS, self.repaint_progress)
+
+    def on_parallel_change(self, value):
+        self.downloader.set_max_concurrency(max_workers=int(value))
+
+    def audio_only_text(self):
+        # The output format comes from the selected audio profile
+        profile = AUDIO_PROFILES.get(self.config.get("audio_profile")) or AUDIO_PROFILES[DEFAULT_PROFILE]
+        codec = profile['codec']
+        return "Chỉ tải âm thanh" + (f" ({codec.upper()})" if codec != 'best' else "")
+
+    def on_audio_profile_change(self, label):
+        for name, profile in AUDIO_PROFILES.items():
+            if profile['label'] == label:
+                self.config.set("audio_profile", name)
+        self.chk_audio.configure(text=self.audio_only_text())
+
+    def on_speed_limit_change(self, value):
+        mb = 0 if value == "Unlimited" else int(value.split()[0])
+        self.downloader.set_bandwidth_limits(global_kbps=mb * 1024)
+
+    def open_stats(self):
+        if self.stats_panel is not None and self.stats_panel.winfo_exists():
+            self.stats_panel.focus()
+            return
+        self.stats_panel = TelemetryPanel(self, self.downloader)
+
+    def on_prefetched(self, url, info):
+        # Prefetch thread: warm the thumbnail cache so the card shows it at once
+        thumb_url = info.get('thumbnail')
+        if thumb_url:
+            platform = info.get('extractor_key', 'Web')
+            self.thumbnails.fetch(thumb_url, lambda img: None, key=f"{platform}:{info.get('id')}" if info.get('id') else None)
+
+    def on_job_state(self, job):
+        # Called from scheduler threads, painted by repaint_progress
+        self.queue_dirty = True
+
+    def drain_events(self):
+        for event in self.event_poller.drain():
+            if event['event'] == PROGRESS and event.get('status') == 'downloading':
+                self.job_speeds[event['job']] = event.get('speed') or 0
+            else:
+                self.job_speeds.pop(event['job'], None)
+        total = sum(self.job_speeds.values())
+        text = f" • {total / 1024 / 1024:.1f} MB/s" if total else ""
+        if text != self.total_speed_text:
+            self.total_speed_text = text
+            self.queue_dirty = True
+
+    def update_queue_summary(self):
+        stats = self.downloader.scheduler.stats()
+        self.lbl_section.configure(text=f"Downloading ({stats['running']} running • {stats['queued']} queued{self.total_speed_text})")
 
     def manual_check_update(self):
         self.btn_check_update.configure(state="disabled", text="Checking...")
@@ -449,6 +963,7 @@ class App(ctk.CTk):
     def run_check(self, is_manual=False):
         try:
             # URL to check version
+            import requests
             VERSION_URL = "https://raw.githubusercontent.com/thanhlone2k6/YTB-DOWNLOAD-VIP/main/version.json"
             response = requests.get(VERSION_URL, timeout=5)
             if response.status_code == 200:
@@ -507,6 +1022,7 @@ class App(ctk.CTk):
 
     def _download_and_install(self, url, popup):
         try:
+            import requests
             # 1. Download new exe to temp name
             response = requests.get(url, stream=True)
             total_size = int(response.headers.get('content-length', 0))
@@ -555,66 +1071,215 @@ if __name__ == "__main__":
     app.after(2000, app.check_update)
     app.mainloop()
 
+class PlaylistRow(ctk.CTkFrame):
+    """One visible entry of PlaylistSelectionDialog, recycled while scrolling."""
+
+    def __init__(self, parent, dialog):
+        super().__init__(parent)
+        self.dialog = dialog
+        self.index = None
+        self.cb = ctk.CTkCheckBox(self, text="", width=500, command=self.on_click)
+        self.cb.pack(side="left", padx=5, pady=5)
+
+    def show(self, index, force=False):
+        if index == self.index and not force:
+            return
+        self.index = index
+        selection = self.dialog.selection
+        title = selection.title(index)
+        # Limit title length
+        if len(title) > 60: title = title[:57] + "..."
+        if index in selection.archived: title += " (downloaded)"
+        self.cb.configure(text=f"{index}. {title}")
+        if selection.is_selected(index):
+            self.cb.select()
+        else:
+            self.cb.deselect()
+
+    def on_click(self):
+        self.dialog.on_toggle(self.index, self.cb.get() == 1)
+
+
 class PlaylistSelectionDialog(ctk.CTkToplevel):
-    def __init__(self, parent, video_list, on_confirm):
+    """
+    Picks the entries of a playlist. Only the visible rows have widgets
+    (see VirtualList) and the selection is a PlaylistSelection, so opening
+    a channel with thousands of videos costs about the same as a short one.
+    Shift+click selects a range; the result is a range string ("1-200,250-900").
+    With loading=True the entries arrive through add_entries() and the user
+    may confirm before the last page is in; they are then asked whether the
+    entries not loaded yet are downloaded too (an open range, "N:").
+    """
+    ROW_HEIGHT = 40
+
+    def __init__(self, parent, video_list, on_confirm, archived=None, loading=False):
         super().__init__(parent)
         self.title("Select Videos to Download")
-        self.geometry("600x500")
+        self.geometry("600x540")
         self.on_confirm = on_confirm
-        self.check_vars = []
-        
+        self.selection = PlaylistSelection(video_list, archived)
+        self.view = SelectionView(self.selection)
+        self.last_index = None
+        self.shift_down = False
+        self.loading = loading
+
         # Make modal-like
         self.transient(parent)
         self.grab_set()
-        
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.bind("<KeyPress-Shift_L>", lambda e: self._set_shift(True))
+        self.bind("<KeyPress-Shift_R>", lambda e: self._set_shift(True))
+        self.bind("<KeyRelease-Shift_L>", lambda e: self._set_shift(False))
+        self.bind("<KeyRelease-Shift_R>", lambda e: self._set_shift(False))
+
         # Title
-        ctk.CTkLabel(self, text=f"Found {len(video_list)} videos", font=("Arial", 18, "bold")).pack(pady=10)
-        
-        # Scrollable List
-        self.scroll_frame = ctk.CTkScrollableFrame(self, width=550, height=350)
-        self.scroll_frame.pack(pady=10, padx=10, fill="both", expand=True)
-        
-        # Populate
-        # video_list is list of dicts from 'entries'
-        for i, vid in enumerate(video_list, 1):
-            title = vid.get('title', f"Video {i}")
-            # Limit title length
-            if len(title) > 60: title = title[:57] + "..."
-            
-            var = ctk.BooleanVar(value=True)
-            self.check_vars.append((i, var))
-            
-            row = ctk.CTkFrame(self.scroll_frame)
-            row.pack(fill="x", pady=2)
-            
-            cb = ctk.CTkCheckBox(row, text=f"{i}. {title}", variable=var, width=500)
-            cb.pack(side="left", padx=5, pady=5)
-            
+        self.lbl_title = ctk.CTkLabel(self, text="", font=("Arial", 18, "bold"))
+        self.lbl_title.pack(pady=10)
+
+        # Search
+        self.search_entry = ctk.CTkEntry(self, placeholder_text="Search titles...")
+        self.search_entry.pack(fill="x", padx=10)
+        self.search_entry.bind("<KeyRelease>", self.on_search)
+
         # Buttons
         btn_frame = ctk.CTkFrame(self)
         btn_frame.pack(pady=10, fill="x", side="bottom")
-        
+
         ctk.CTkButton(btn_frame, text="Select All", command=self.select_all).pack(side="left", padx=20, pady=10)
         ctk.CTkButton(btn_frame, text="Deselect All", command=self.deselect_all).pack(side="left", padx=20, pady=10)
         ctk.CTkButton(btn_frame, text="Download Selected", command=self.confirm, fg_color="#28a745", hover_color="#218838").pack(side="right", padx=20, pady=10)
 
+        self.lbl_count = ctk.CTkLabel(self, text="", text_color=COLORS["text_sec"])
+        self.lbl_count.pack(side="bottom")
+
+        # Virtualized list
+        self.list = VirtualList(self, self.view, lambda parent: PlaylistRow(parent, self), self.ROW_HEIGHT)
+        self.list.pack(pady=10, padx=10, fill="both", expand=True)
+        self.update_count()
+
+    def _set_shift(self, down):
+        self.shift_down = down
+
+    def on_toggle(self, index, selected):
+        if self.shift_down and self.last_index is not None:
+            self.selection.set_range(self.last_index, index, selected)
+            self.list.refresh(force=True)
+        else:
+            self.selection.set(index, selected)
+        self.last_index = index
+        self.update_count()
+
+    def on_search(self, event=None):
+        self.view.set_query(self.search_entry.get())
+        self.list.offset = 0
+        self.list.refresh(force=True)
+
+    def update_count(self):
+        suffix = " (loading...)" if self.loading else ""
+        self.lbl_title.configure(text=f"Found {len(self.selection)} videos{suffix}")
+        self.lbl_count.configure(text=f"{self.selection.count()} / {len(self.selection)} selected")
+
+    def add_entries(self, entries, archived=None):
+        """Appends a page of a playlist that is still being fetched."""
+        self.selection.extend(entries, archived)
+        if self.view.query:
+            self.view.set_query(self.view.query)
+        self.list.refresh()
+        self.update_count()
+
+    def loading_done(self):
+        self.loading = False
+        self.update_count()
+
     def select_all(self):
-        for _, var in self.check_vars: var.set(True)
+        # With a search active, only the matching entries
+        self.selection.set_many(self.view.indices, True)
+        self.list.refresh(force=True)
+        self.update_count()
 
     def deselect_all(self):
-        for _, var in self.check_vars: var.set(False)
+        self.selection.set_many(self.view.indices, False)
+        self.list.refresh(force=True)
+        self.update_count()
+
+    def cancel(self):
+        self.on_confirm(None)
+        self.destroy()
 
     def confirm(self):
-        # Gather selected indices
-        selected = []
-        for i, var in self.check_vars:
-            if var.get():
-                selected.append(str(i))
-        
-        if not selected:
-            return # Do nothing if empty? Or allow close?
-            
-        # Join as string for yt-dlp "1,2,5-7" style (simplest is comma separated)
-        selection_str = ",".join(selected)
+        # yt-dlp playlist_items ranges, e.g. "1-200,250-900"
+        selection_str = self.selection.to_ranges()
+        if not selection_str:
+            return # Nothing selected
+        if self.loading:
+            loaded = len(self.selection)
+            answer = messagebox.askyesnocancel(
+                "Playlist still loading",
+                f"Only {loaded} videos are loaded so far.\n\n"
+                "Yes: also download every video not loaded yet\n"
+                "No: download only the selected videos\n"
+                "Cancel: keep loading",
+                parent=self)
+            if answer is None:
+                return
+            if answer:
+                selection_str = f"{selection_str},{loaded + 1}:"
         self.on_confirm(selection_str)
-        self.destroy()
\ No newline at end of file
+        self.destroy()
+
+
+def _format_rate(value):
+    return f"{value / 1024 / 1024:.2f} MB/s" if value else "-"
+
+
+class TelemetryPanel(ctk.CTkToplevel):
+    """Live summary of downloader.telemetry (recent jobs) and of the shared components."""
+    REFRESH_MS = 1000
+
+    def __init__(self, parent, downloader):
+        super().__init__(parent)
+        self.title("Statistics")
+        self.geometry("420x460")
+        self.downloader = downloader
+        self.transient(parent)
+
+        self.lbl_stats = ctk.CTkLabel(self, text="", font=("Consolas", 13), justify="left", anchor="nw")
+        self.lbl_stats.pack(fill="both", expand=True, padx=15, pady=15)
+        ctk.CTkButton(self, text="Copy Prometheus metrics", fg_color=COLORS["border"], hover_color=COLORS["accent"],
+                      command=self.copy_prometheus).pack(pady=(0, 15))
+        self.refresh()
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        summary = self.downloader.telemetry.summary()
+        gauges = self.downloader.metrics_gauges()
+        prefetch = self.downloader.prefetcher.stats()
+        rate = summary['success_rate']
+        lines = [
+            f"Jobs finished      {summary['jobs']} ({summary['failed']} failed)",
+            f"Success rate       {rate * 100:.0f}%" if rate is not None else "Success rate       -",
+            f"Retries            {summary['retries']}",
+            f"Downloaded         {summary['bytes'] / 1024 / 1024:.1f} MB",
+            f"Avg speed          {_format_rate(summary['avg_speed'])}",
+            f"Peak speed         {_format_rate(summary['peak_speed'])}",
+            f"Time to first byte {summary['avg_time_to_first_byte']:.2f} s",
+            "",
+            "Average stage time",
+        ]
+        lines += [f"  {stage:<16} {seconds:.2f} s" for stage, seconds in summary['avg_stages'].items()]
+        lines += [
+            "",
+            f"Running / queued   {gauges['jobs_running']} / {gauges['jobs_queued']}",
+            f"Conversions        {gauges['postprocess_active']}",
+            f"Paused hosts       {gauges['hosts_paused']}",
+            f"Prefetched         {prefetch['used']} used / {prefetch['stale']} stale / {prefetch['ready']} ready",
+            f"Info cache         {gauges['info_cache_hits']} hits / {gauges['info_cache_misses']} misses"
+            f" ({gauges['info_cache_hit_rate'] * 100:.0f}%), {gauges['info_cache_evictions']} evicted",
+        ]
+        self.lbl_stats.configure(text="\n".join(lines))
+        self.after(self.REFRESH_MS, self.refresh)
+
+    def copy_prometheus(self):
+        self.clipboard_clear()
+        self.clipboard_append(self.downloader.telemetry.prometheus_text(self.downloader.metrics_gauges()))
@@ -0,0 +1,140 @@
+import sqlite3
+import threading
+import time
+
+from scheduler import QUEUED, RUNNING, DONE, FAILED, CANCELLED
+
+# Jobs in these states are picked up again on the next start
+RESUMABLE = (QUEUED, RUNNING)
+# Finished jobs are kept this long for history, then pruned
+KEEP_FINISHED_SECONDS = 7 * 24 * 3600
+
+
+class JobJournal:
+    """
+    Durable record of download jobs (SQLite), so a batch can be
+    rehydrated after the app is closed or crashes mid-download.
+    """
+
+    COLUMNS = ('id', 'url', 'format_type', 'output_path', 'playlist_title', 'playlist_items',
+               'status', 'bytes_done', 'bytes_total', 'error', 'created', 'updated')
+    UPDATABLE = ('format_type', 'output_path', 'playlist_title', 'playlist_items', 'status',
+                 'bytes_done', 'bytes_total', 'error')
+
+    def __init__(self, path, progress_interval=2.0):
+        self.path = path
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                format_type TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                playlist_title TEXT,
+                playlist_items TEXT,
+                status TEXT NOT NULL,
+                bytes_done INTEGER DEFAULT 0,
+                bytes_total INTEGER,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self._db.commit()
+
+    def add(self, url, output_path, format_type='video', playlist_title=None, playlist_items=None):
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO jobs (url, format_type, output_path, playlist_title, playlist_items, status, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, format_type, output_path, playlist_title, playlist_items, QUEUED, now, now))
+            self._db.commit()
+            return cur.lastrowid
+
+    def add_many(self, urls, output_path, format_type='video'):
+        """Queues several jobs in one transaction. Returns their ids, in order."""
+        now = time.time()
+        ids = []
+        with self._lock:
+            for url in urls:
+                cur = self._db.execute(
+                    "INSERT INTO jobs (url, format_type, output_path, status, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                    (url, format_type, output_path, QUEUED, now, now))
+                ids.append(cur.lastrowid)
+            self._db.commit()
+        return ids
+
+    def update(self, job_id, **fields):
+        fields = {k: v for k, v in fields.items() if k in self.UPDATABLE}
+        if not fields:
+            return
+        fields['updated'] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def set_status(self, job_id, status, error=None):
+        self.update(job_id, status=status, error=error)
+
+    def finish(self, job_id, success, message=None):
+        if success:
+            self.set_status(job_id, DONE)
+        elif message and "Stopped by user" in message:
+            self.set_status(job_id, CANCELLED)
+        else:
+            self.set_status(job_id, FAILED, error=message)
+
+    def cancel(self, job_id):
+        """Marks a job cancelled unless it already finished."""
+        placeholders = ", ".join("?" for _ in RESUMABLE)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET status = ?, updated = ? WHERE id = ? AND status IN ({placeholders})",
+                             (CANCELLED, time.time(), job_id, *RESUMABLE))
+            self._db.commit()
+
+    def progress_hook(self, job_id):
+        """yt-dlp progress hook that records bytes done, at most every progress_interval seconds."""
+        last = [0.0]
+
+        def hook(d):
+            now = time.time()
+            if d.get('status') == 'downloading' and now - last[0] < self.progress_interval:
+                return
+            last[0] = now
+            self.update(job_id,
+                        bytes_done=d.get('downloaded_bytes') or 0,
+                        bytes_total=d.get('total_bytes') or d.get('total_bytes_estimate'))
+        return hook
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(self.COLUMNS, row)) if row else None
+
+    def pending(self):
+        """Jobs that were queued or running when the app stopped, oldest first."""
+        placeholders = ", ".join("?" for _ in RESUMABLE)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE status IN ({placeholders}) ORDER BY id",
+                RESUMABLE).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def finished_urls(self):
+        """URLs of the jobs completed in the history window (see prune)."""
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT url FROM jobs WHERE status = ?", (DONE,)).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, older_than=KEEP_FINISHED_SECONDS):
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated < ?",
+                             (DONE, FAILED, CANCELLED, time.time() - older_than))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
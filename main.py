@@ -1,5 +1,8 @@
+import time
+STARTED_AT = time.perf_counter() # Reference point for time-to-first-frame
+
 from gui import App
 
 if __name__ == "__main__":
-    app = App()
+    app = App(started_at=STARTED_AT)
     app.mainloop()
@@ -0,0 +1,165 @@
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, parse_qsl
+
+from url_utils import normalize_url
+
+# Seconds an info dict stays valid, by extractor_key.
+# Video infos carry signed stream URLs, flat playlist listings do not.
+EXTRACTOR_TTL = {
+    "Youtube": 3 * 3600,
+    "YoutubeTab": 3600,
+    "YoutubePlaylist": 3600,
+    "TikTok": 1800,
+    "Facebook": 1800,
+    "Instagram": 1800,
+}
+DEFAULT_TTL = 1800
+# Refresh this long before a signed URL actually expires
+EXPIRY_MARGIN = 600
+
+
+def stream_expiry(info):
+    """
+    Earliest expiry timestamp found in the signed format URLs of an info dict
+    (the "expire" query parameter YouTube and others use), or None.
+    """
+    earliest = None
+    for fmt in info.get('requested_formats') or info.get('formats') or [info]:
+        url = fmt.get('url') if isinstance(fmt, dict) else None
+        if not url or 'expire' not in url:
+            continue
+        try:
+            value = dict(parse_qsl(urlparse(url).query)).get('expire')
+            if value is None:
+                # Some CDNs put it in the path: /expire/1700000000/
+                parts = urlparse(url).path.split('/')
+                if 'expire' in parts:
+                    value = parts[parts.index('expire') + 1]
+            if value:
+                value = int(value)
+                earliest = value if earliest is None else min(earliest, value)
+        except (ValueError, IndexError):
+            continue
+    return earliest
+
+
+def info_ttl(info, now=None):
+    now = now or time.time()
+    ttl = EXTRACTOR_TTL.get(info.get('extractor_key'), DEFAULT_TTL)
+    expiry = stream_expiry(info)
+    if expiry:
+        ttl = min(ttl, expiry - EXPIRY_MARGIN - now)
+    return ttl
+
+
+class MetadataCache:
+    """
+    On-disk (SQLite) cache of info dicts keyed by normalized URL.
+    Entries expire per extractor and the least recently used ones
+    are evicted once the cache grows over max_bytes.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, enabled=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS info_cache (
+                key TEXT PRIMARY KEY,
+                extractor TEXT,
+                info TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_info_cache_accessed ON info_cache(accessed)")
+        self._db.commit()
+
+    def get(self, url):
+        """Cached info dict for url, or None on miss/expiry."""
+        if not self.enabled:
+            return None
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT info, expires FROM info_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM info_cache WHERE key = ?", (key,))
+                self._db.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE info_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url, info):
+        """info must be JSON serializable (see YoutubeDL.sanitize_info)."""
+        if not self.enabled or not info or 'error' in info:
+            return
+        now = time.time()
+        ttl = info_ttl(info, now)
+        if ttl <= 0:
+            return
+        data = json.dumps(info)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO info_cache (key, extractor, info, size, created, expires, accessed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), info.get('extractor_key'), data, len(data), now, now + ttl, now))
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        # Called with the lock held
+        self._db.execute("DELETE FROM info_cache WHERE expires <= ?", (time.time(),))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM info_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM info_cache ORDER BY accessed").fetchall():
+            self._db.execute("DELETE FROM info_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def invalidate(self, url):
+        with self._lock:
+            self._db.execute("DELETE FROM info_cache WHERE key = ?", (normalize_url(url),))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM info_cache")
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM info_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,99 @@
+class PlaylistSelection:
+    """
+    Which playlist entries are selected, one byte per entry (1-based
+    indices, like yt-dlp's playlist_items). Titles are read from the
+    entries only when shown or searched, so building it is O(1) per entry.
+    """
+
+    def __init__(self, entries, archived=None):
+        self.entries = entries
+        self.archived = set(archived or ())
+        self.bits = bytearray(b'\x01') * len(entries)
+        for i in self.archived:
+            if 1 <= i <= len(entries):
+                self.bits[i - 1] = 0
+        self._search_titles = None
+
+    def __len__(self):
+        return len(self.bits)
+
+    def extend(self, entries, archived=None):
+        """Appends a page of entries (selected unless archived; indices are 1-based overall)."""
+        self.entries.extend(entries)
+        self.bits.extend(b'\x01' * len(entries))
+        for i in archived or ():
+            self.archived.add(i)
+            self.bits[i - 1] = 0
+        self._search_titles = None
+
+    def title(self, index):
+        return self.entries[index - 1].get('title') or f"Video {index}"
+
+    def is_selected(self, index):
+        return self.bits[index - 1] == 1
+
+    def set(self, index, value):
+        self.bits[index - 1] = 1 if value else 0
+
+    def toggle(self, index):
+        self.bits[index - 1] ^= 1
+        return self.bits[index - 1] == 1
+
+    def set_range(self, first, last, value):
+        """Selects/deselects first..last inclusive, in either order."""
+        if first > last:
+            first, last = last, first
+        self.bits[first - 1:last] = (b'\x01' if value else b'\x00') * (last - first + 1)
+
+    def set_many(self, indices, value):
+        if indices is None:
+            self.bits[:] = (b'\x01' if value else b'\x00') * len(self.bits)
+            return
+        for i in indices:
+            self.bits[i - 1] = 1 if value else 0
+
+    def count(self):
+        return self.bits.count(1)
+
+    def search(self, query):
+        """1-based indices whose title contains query (case-insensitive), None for no filter."""
+        query = query.strip().lower()
+        if not query:
+            return None
+        if self._search_titles is None:
+            self._search_titles = [(e.get('title') or "").lower() for e in self.entries]
+        return [i for i, title in enumerate(self._search_titles, 1) if query in title]
+
+    def to_ranges(self):
+        """Selection as a playlist_items string, e.g. "1-200,250-900"."""
+        parts = []
+        bits = bytes(self.bits)
+        start = bits.find(1)
+        while start != -1:
+            end = bits.find(0, start)
+            if end == -1:
+                end = len(bits)
+            parts.append(str(start + 1) if end - start == 1 else f"{start + 1}-{end}")
+            start = bits.find(1, end)
+        return ",".join(parts)
+
+
+class SelectionView:
+    """The entries listed by the dialog: all of them, or the search results."""
+
+    def __init__(self, selection):
+        self.selection = selection
+        self.query = ""
+        self.indices = None  # None means every entry
+
+    def set_query(self, query):
+        self.query = query
+        self.indices = self.selection.search(query)
+
+    def __len__(self):
+        return len(self.selection) if self.indices is None else len(self.indices)
+
+    def window(self, first, count):
+        if self.indices is None:
+            return list(range(first + 1, min(first + count, len(self.selection)) + 1))
+        return self.indices[first:first + count]
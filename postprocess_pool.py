@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Pipeline stages reported to stage hooks
+DOWNLOADING = "downloading"
+CONVERTING = "converting"
+RETRYING = "retrying"
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+class PostProcessPool:
+    """
+    CPU-bound post-processing (ffmpeg transcodes), kept apart from the
+    network workers of the DownloadScheduler.
+    Every task runs ffmpeg as its own process, so a thread per CPU core is
+    enough to keep the cores busy; the threads only wait on the subprocess.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or default_workers()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="postprocess")
+        self._lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+
+    def batch(self):
+        """Collects the tasks of one download job."""
+        return PostProcessBatch(self)
+
+    def submit(self, func, *args):
+        with self._lock:
+            self.active += 1
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.max_workers, 'active': self.active, 'completed': self.completed}
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
+
+
+class PostProcessBatch:
+    """Post-processing tasks queued by one download job (e.g. every track of a playlist)."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.futures = []
+
+    def submit(self, func, *args):
+        future = self.pool.submit(func, *args)
+        self.futures.append(future)
+        return future
+
+    def pending(self):
+        return sum(1 for f in self.futures if not f.done())
+
+    def when_done(self, callback):
+        """Calls callback() once every task submitted so far is done (right away if none is pending)."""
+        futures = [f for f in self.futures if not f.done()]
+        if not futures:
+            callback()
+            return
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def task_done(future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                callback()
+
+        for future in futures:
+            future.add_done_callback(task_done)
+
+    def wait(self):
+        """Waits for every task. Returns (results, errors)."""
+        results, errors = [], []
+        for future in self.futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append(e)
+        return results, errors
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metadata_cache import info_ttl
+from scheduler import QUEUED, RUNNING
+from url_utils import normalize_url
+
+# Longest a job waits for a prefetch of its URL that is already running
+TAKE_TIMEOUT = 60
+
+
+class Prefetcher:
+    """
+    Extracts the info of the next `depth` queued jobs (submitted with
+    prefetch=True) while the download slots are busy, so a job that gets a
+    slot goes straight to transferring bytes.
+
+    Prefetched infos are handed over once through take(); an info whose
+    signed stream URLs would expire (see metadata_cache.info_ttl) is
+    dropped and extracted again by the job. Listeners get (url, info) after
+    each prefetch, e.g. to warm the thumbnail cache.
+    """
+
+    def __init__(self, downloader, depth=2, workers=2):
+        self.downloader = downloader
+        self.depth = depth
+        self.prefetched = 0
+        self.used = 0
+        self.stale = 0
+        self._store = OrderedDict()  # key -> (info, expires)
+        self._inflight = {}  # key -> threading.Event
+        self._listeners = []
+        self._topping_up = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def on_job_state(self, job):
+        """
+        Scheduler listener: tops up the prefetches when the queue moves.
+        Runs on the submitting thread (often Tk's), so it only schedules one
+        top-up on the prefetch pool; a burst of submits shares it.
+        """
+        if self.depth <= 0 or job.state not in (QUEUED, RUNNING):
+            return
+        with self._lock:
+            if self._topping_up:
+                return
+            self._topping_up = True
+        try:
+            self._executor.submit(self._top_up)
+        except RuntimeError:
+            # Shut down
+            self._topping_up = False
+
+    def _top_up(self):
+        with self._lock:
+            self._topping_up = False
+        upcoming = self.downloader.scheduler.next_jobs(self.depth, lambda j: j.prefetch and j.url)
+        for queued in upcoming:
+            key = normalize_url(queued.url)
+            with self._lock:
+                if key in self._store or key in self._inflight:
+                    continue
+                self._inflight[key] = threading.Event()
+            self._executor.submit(self._prefetch, queued.url, key)
+
+    def _prefetch(self, url, key):
+        try:
+            if self.downloader.find_archived(url):
+                return
+            info = self.downloader.extract_info(url)
+            if 'error' not in info:
+                with self._lock:
+                    self._store[key] = (info, time.time() + info_ttl(info))
+                    while len(self._store) > max(8, self.depth * 4):
+                        self._store.popitem(last=False)
+                    self.prefetched += 1
+                for callback in list(self._listeners):
+                    try:
+                        callback(url, info)
+                    except Exception as e:
+                        print(f"Prefetch listener error: {e}")
+        except Exception as e:
+            print(f"Prefetch error ({url}): {e}")
+        finally:
+            with self._lock:
+                done = self._inflight.pop(key, None)
+            if done:
+                done.set()
+
+    def take(self, url):
+        """Prefetched info for url (waits for a running prefetch), or None."""
+        key = normalize_url(url)
+        with self._lock:
+            running = self._inflight.get(key)
+        if running:
+            running.wait(TAKE_TIMEOUT)
+        with self._lock:
+            entry = self._store.pop(key, None)
+            if entry is None:
+                return None
+            info, expires = entry
+            if expires <= time.time():
+                self.stale += 1
+                return None
+            self.used += 1
+        return info
+
+    def stats(self):
+        with self._lock:
+            return {'depth': self.depth, 'prefetched': self.prefetched, 'used': self.used,
+                    'stale': self.stale, 'ready': len(self._store), 'running': len(self._inflight)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
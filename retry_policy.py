@@ -0,0 +1,122 @@
+import random
+import re
+import threading
+import time
+
+# Failure classes
+THROTTLED = "throttled"
+EXPIRED = "expired"          # signed stream URL no longer valid
+GEO_BLOCKED = "geo_blocked"
+NETWORK = "network"
+EXTRACTOR = "extractor"      # site changed / yt-dlp needs an update
+UNAVAILABLE = "unavailable"  # private, removed, members only...
+CANCELLED = "cancelled"
+UNKNOWN = "unknown"
+
+# Actions
+RETRY = "retry"          # same info, resumes the .part file
+REEXTRACT = "reextract"  # drop cached info, fetch fresh stream URLs
+GIVE_UP = "give_up"
+
+# First match wins, checked against the error message
+PATTERNS = (
+    (CANCELLED, r"Stopped by user"),
+    (GEO_BLOCKED, r"available (in|from) your (country|location)|geo.?restrict|blocked it in your country"),
+    (UNAVAILABLE, r"Private video|Video unavailable|has been removed|members.only|Sign in to confirm your age|account.+terminated|This video is not available"),
+    (THROTTLED, r"HTTP Error 429|Too Many Requests|rate.?limit|HTTP Error 503|Service Unavailable"),
+    (EXPIRED, r"HTTP Error 403|Forbidden|HTTP Error 410|signature|expired"),
+    (NETWORK, r"timed out|Timeout|Connection (reset|aborted|refused)|RemoteDisconnected|IncompleteRead|"
+              r"getaddrinfo failed|Name or service not known|Temporary failure in name resolution|"
+              r"HTTP Error 50[024]|Errno 10054|Errno 104|SSL|EOF occurred"),
+    (EXTRACTOR, r"Unable to extract|Unsupported URL|nsig|please report this issue|ExtractorError|Requested format is not available"),
+)
+_COMPILED = tuple((kind, re.compile(pattern, re.I)) for kind, pattern in PATTERNS)
+
+# What to do for each class; max tries are on top of the first attempt
+ACTIONS = {
+    THROTTLED: (RETRY, 6),
+    EXPIRED: (REEXTRACT, 3),
+    NETWORK: (RETRY, 8),
+    EXTRACTOR: (REEXTRACT, 1),
+    UNKNOWN: (RETRY, 2),
+    GEO_BLOCKED: (GIVE_UP, 0),
+    UNAVAILABLE: (GIVE_UP, 0),
+    CANCELLED: (GIVE_UP, 0),
+}
+# Throttling backs off harder than a dropped connection
+DELAY_FACTOR = {THROTTLED: 4, EXPIRED: 0.5, EXTRACTOR: 1, NETWORK: 1, UNKNOWN: 1}
+
+
+def classify(message):
+    message = str(message or "")
+    for kind, pattern in _COMPILED:
+        if pattern.search(message):
+            return kind
+    return UNKNOWN
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter (half to full delay), tries and action per failure class."""
+
+    def __init__(self, max_attempts=None, base_delay=2.0, max_delay=300.0):
+        self.max_attempts = max_attempts  # overall cap, None = per-class limits only
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def decide(self, kind, attempt):
+        """attempt: number of retries already made. Returns (action, delay_seconds)."""
+        action, tries = ACTIONS.get(kind, ACTIONS[UNKNOWN])
+        if action == GIVE_UP or attempt >= tries:
+            return GIVE_UP, 0
+        if self.max_attempts is not None and attempt + 1 >= self.max_attempts:
+            return GIVE_UP, 0
+        ceiling = min(self.max_delay, self.base_delay * DELAY_FACTOR.get(kind, 1) * 2 ** attempt)
+        return action, random.uniform(ceiling / 2, ceiling)
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker: after `threshold` consecutive throttling/network
+    failures the host is paused for `cooldown` seconds (doubling while it
+    keeps failing), so the other jobs on that host stop hammering it too.
+    """
+
+    TRIP_ON = (THROTTLED, NETWORK)
+
+    def __init__(self, threshold=4, cooldown=60.0, max_cooldown=900.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._failures = {}    # host -> consecutive failures
+        self._open_until = {}  # host -> monotonic time
+        self._trips = {}       # host -> times opened in a row
+        self._lock = threading.Lock()
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._trips.pop(host, None)
+            self._open_until.pop(host, None)
+
+    def record_failure(self, host, kind):
+        if kind not in self.TRIP_ON:
+            return
+        with self._lock:
+            count = self._failures.get(host, 0) + 1
+            self._failures[host] = count
+            if count >= self.threshold:
+                trips = self._trips.get(host, 0)
+                self._open_until[host] = time.monotonic() + min(self.max_cooldown, self.cooldown * 2 ** trips)
+                self._trips[host] = trips + 1
+                self._failures[host] = 0
+
+    def wait_time(self, host):
+        """Seconds until the host may be tried again, 0 when the breaker is closed."""
+        with self._lock:
+            until = self._open_until.get(host)
+        return max(0.0, until - time.monotonic()) if until else 0.0
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {host: round(until - now, 1) for host, until in self._open_until.items() if until > now}
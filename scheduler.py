@@ -0,0 +1,376 @@
+import heapq
+import ipaddress
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Hosts that are the same service behind different names
+HOST_ALIASES = {
+    "youtu.be": "youtube.com",
+    "youtube-nocookie.com": "youtube.com",
+    "fb.watch": "facebook.com",
+    "vm.tiktok.com": "tiktok.com",
+}
+# Subdomains that are the same service as the bare domain
+HOST_PREFIXES = ("www.", "m.", "mobile.", "music.", "web.", "mbasic.", "vt.")
+
+
+def host_key(url):
+    """
+    Groups a URL by service so per-host limits apply to
+    www./m./music. variants of the same site. IP addresses are kept as is.
+    """
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    host = HOST_ALIASES.get(host, host)
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    return HOST_ALIASES.get(host, host)
+
+
+class Job:
+    def __init__(self, scheduler, func, args, kwargs, url, priority, on_state, prefetch=False):
+        self.id = next(scheduler._ids)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.url = url
+        self.host = host_key(url) if url else ""
+        self.priority = priority
+        self.on_state = on_state
+        self.prefetch = prefetch  # url may be extracted ahead of time (see prefetcher)
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._scheduler = scheduler
+        self._done = threading.Event()
+        self._yielded = False
+
+    @property
+    def queue_wait(self):
+        end = self.started_at or time.time()
+        return end - self.submitted_at
+
+    def cancel(self):
+        """Removes the job if it has not started yet. Returns True on success."""
+        return self._scheduler.cancel(self)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def yield_slot(self):
+        """
+        Called from the running job: gives its worker and host slot back so
+        the next download can start while this job finishes CPU-only work
+        (e.g. audio conversion). The job still reports DONE/FAILED as usual.
+        """
+        self._scheduler._yield_slot(self)
+
+    def sleep(self, seconds, is_cancelled=None):
+        """
+        Called from the running job: waits without holding its worker and
+        host slot (e.g. retry backoff), then waits for a slot again; the job
+        goes ahead of queued ones. Returns False if cancelled meanwhile, the
+        job then goes on without a slot, like after yield_slot().
+        """
+        return self._scheduler._park(self, seconds, is_cancelled)
+
+
+class _Resume:
+    """A parked job waiting to get a slot back (see Job.sleep)."""
+
+    def __init__(self, job, not_before):
+        self.job = job
+        self.not_before = not_before
+        self.wake = threading.Event()
+        self.stopped = False
+
+
+class DownloadScheduler:
+    """
+    Bounded worker pool for download jobs.
+    Jobs run highest priority first, FIFO within the same priority,
+    and at most per_host_limit jobs of the same host run at once.
+    A paused host (pause_host) starts no job until the pause is over.
+    """
+
+    def __init__(self, max_workers=3, per_host_limit=2):
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._heap = []
+        self._running = {}  # host -> count
+        self._paused = {}  # host -> monotonic time
+        self._resuming = []  # _Resume, served before the queue
+        self._workers = 0
+        self._idle = 0
+        self._counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, CANCELLED: 0}
+        self._listeners = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    # --- Public API ---
+    def submit(self, func, *args, url=None, priority=0, on_state=None, prefetch=False, **kwargs):
+        job = Job(self, func, args, kwargs, url, priority, on_state, prefetch)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            heapq.heappush(self._heap, (-priority, next(self._seq), job))
+            self._counts[QUEUED] += 1
+            self._spawn_worker_if_needed()
+            self._cond.notify()
+        self._notify(job)
+        return job
+
+    def cancel(self, job):
+        with self._cond:
+            if job.state != QUEUED:
+                return False
+            self._heap = [item for item in self._heap if item[2] is not job]
+            heapq.heapify(self._heap)
+            self._set_state(job, CANCELLED)
+            job.finished_at = time.time()
+            job._done.set()
+        self._notify(job)
+        return True
+
+    def set_limits(self, max_workers=None, per_host_limit=None):
+        """Changes the limits live. Extra workers exit after their current job."""
+        with self._cond:
+            if max_workers is not None:
+                self.max_workers = max(1, int(max_workers))
+            if per_host_limit is not None:
+                self.per_host_limit = max(1, int(per_host_limit))
+            self._spawn_worker_if_needed()
+            self._cond.notify_all()
+
+    def pause_host(self, host, seconds):
+        """Starts no job of host for the next seconds (e.g. while its circuit breaker is open)."""
+        with self._cond:
+            until = time.monotonic() + seconds
+            if until > self._paused.get(host, 0):
+                self._paused[host] = until
+            self._cond.notify_all()
+
+    def add_listener(self, callback):
+        """callback(job) is called from worker threads on every state change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def queued_jobs(self):
+        """Queued jobs in the order they will be considered."""
+        with self._cond:
+            return [item[2] for item in sorted(self._heap)]
+
+    def next_jobs(self, count, predicate=None):
+        """The first count queued jobs (matching predicate) in queue order, without sorting the whole queue."""
+        with self._cond:
+            items = [item for item in self._heap if predicate is None or predicate(item[2])]
+            return [item[2] for item in heapq.nsmallest(count, items)]
+
+    def current_job(self):
+        """The job running on the calling thread, or None."""
+        return getattr(self._local, 'job', None)
+
+    def stats(self):
+        with self._cond:
+            return dict(self._counts)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            pending = [item[2] for item in self._heap]
+            self._heap = []
+            for job in pending:
+                self._set_state(job, CANCELLED)
+                job._done.set()
+            for resume in self._resuming:
+                # Parked jobs stop without their slot
+                resume.stopped = True
+                resume.job._yielded = True
+                resume.wake.set()
+            self._resuming = []
+            self._cond.notify_all()
+        for job in pending:
+            self._notify(job)
+
+    # --- Internals ---
+    def _spawn_worker_if_needed(self):
+        # Called with the lock held
+        if self._idle == 0 and self._workers < self.max_workers and (self._heap or self._resuming):
+            self._workers += 1
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def _host_free(self, host, now):
+        # Called with the lock held
+        if not host:
+            return True
+        if self._paused.get(host, 0) > now:
+            return False
+        self._paused.pop(host, None)
+        return self._running.get(host, 0) < self.per_host_limit
+
+    def _pop_resumable(self):
+        # Called with the lock held. A parked job whose wait is over and whose host has room.
+        now = time.monotonic()
+        for resume in self._resuming:
+            if resume.not_before <= now and self._host_free(resume.job.host, now):
+                self._resuming.remove(resume)
+                return resume
+        return None
+
+    def _next_wakeup(self):
+        # Called with the lock held. Seconds until a parked job's wait or a host pause is over.
+        now = time.monotonic()
+        self._paused = {host: until for host, until in self._paused.items() if until > now}
+        times = [r.not_before for r in self._resuming if r.not_before > now] + list(self._paused.values())
+        if not times:
+            return None
+        return max(0.05, min(times) - now)
+
+    def _pop_runnable(self):
+        # Called with the lock held. Skips jobs whose host is at its limit or paused.
+        skipped = []
+        job = None
+        now = time.monotonic()
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            if self._host_free(item[2].host, now):
+                job = item[2]
+                break
+            skipped.append(item)
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+        return job
+
+    def _set_state(self, job, state):
+        self._counts[job.state] -= 1
+        self._counts[state] += 1
+        job.state = state
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = None
+                resume = None
+                while not self._closed and self._workers <= self.max_workers:
+                    resume = self._pop_resumable()
+                    if resume:
+                        break
+                    job = self._pop_runnable()
+                    if job:
+                        break
+                    self._idle += 1
+                    self._cond.wait(self._next_wakeup())
+                    self._idle -= 1
+                if resume:
+                    # Hand this worker's place to the parked job's thread
+                    self._running[resume.job.host] = self._running.get(resume.job.host, 0) + 1
+                    resume.wake.set()
+                    return
+                if job is None:
+                    self._workers -= 1
+                    return
+                self._running[job.host] = self._running.get(job.host, 0) + 1
+                self._set_state(job, RUNNING)
+                job.started_at = time.time()
+                self._spawn_worker_if_needed()
+            self._notify(job)
+
+            state = DONE
+            self._local.job = job
+            try:
+                job.result = job.func(*job.args, **job.kwargs)
+            except Exception as e:
+                job.error = e
+                state = FAILED
+                print(f"Job {job.id} failed: {e}")
+            finally:
+                self._local.job = None
+
+            with self._cond:
+                if not job._yielded:
+                    self._running[job.host] -= 1
+                self._set_state(job, state)
+                job.finished_at = time.time()
+                job._done.set()
+                # A host slot just freed up, skipped jobs may be runnable now
+                self._cond.notify_all()
+            self._notify(job)
+            if job._yielded:
+                # This thread no longer counts as a worker, a new one took its place
+                return
+
+    def _yield_slot(self, job):
+        with self._cond:
+            if job._yielded or job.state != RUNNING:
+                return
+            job._yielded = True
+            self._running[job.host] -= 1
+            self._workers -= 1
+            self._spawn_worker_if_needed()
+            self._cond.notify_all()
+
+    def _park(self, job, seconds, is_cancelled=None):
+        with self._cond:
+            if job._yielded or job.state != RUNNING:
+                resume = None
+            else:
+                resume = _Resume(job, time.monotonic() + seconds)
+                self._running[job.host] -= 1
+                self._workers -= 1
+                self._resuming.append(resume)
+                self._spawn_worker_if_needed()
+                self._cond.notify_all()
+        if resume is None:
+            # Holds no slot, a plain sleep
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                if is_cancelled and is_cancelled():
+                    return False
+                time.sleep(min(0.5, end - time.monotonic()))
+            return True
+
+        while not resume.wake.wait(0.5):
+            if is_cancelled and is_cancelled():
+                with self._cond:
+                    if resume in self._resuming:
+                        self._resuming.remove(resume)
+                        job._yielded = True
+                        return False
+        return not resume.stopped
+
+    def _notify(self, job):
+        callbacks = list(self._listeners)
+        if job.on_state:
+            callbacks.append(job.on_state)
+        for callback in callbacks:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Scheduler listener error: {e}")
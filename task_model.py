@@ -0,0 +1,76 @@
+import threading
+
+
+class TaskRecord:
+    """
+    Display state of one task, independent of any widget.
+    Download threads only assign fields and bump `version` (reference
+    assignments, atomic under the GIL); the task list repaints the row
+    showing the record when its version changed.
+    """
+    __slots__ = ('task', 'title', 'meta', 'status', 'status_color', 'percent', 'percent_text', 'thumb', 'version')
+
+    def __init__(self, task, title="", meta="", status="Waiting...", status_color=None):
+        self.task = task
+        self.title = title
+        self.meta = meta
+        self.status = status
+        self.status_color = status_color
+        self.percent = 0
+        self.percent_text = "0%"
+        self.thumb = None  # CTkImage, only built on the Tk thread
+        self.version = 0
+
+    def update(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+
+    def publish(self, state):
+        """(percent, percent_text, status, status_color) from a progress hook, None keeps a field."""
+        percent, percent_text, status, status_color = state
+        if percent is not None:
+            self.percent = percent
+            self.percent_text = percent_text
+        if status is not None:
+            self.status = status
+        if status_color is not None:
+            self.status_color = status_color
+        self.version += 1
+
+
+class TaskListModel:
+    """
+    Tasks shown newest first. Stored oldest first so adding is O(1);
+    position 0 is the end of the list.
+    """
+
+    def __init__(self):
+        self._records = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def remove(self, record):
+        with self._lock:
+            try:
+                self._records.remove(record)
+            except ValueError:
+                pass
+
+    def get(self, position):
+        records = self._records
+        return records[len(records) - 1 - position]
+
+    def window(self, first, count):
+        """Records at positions first .. first+count-1 (fewer at the end)."""
+        with self._lock:
+            total = len(self._records)
+            end = total - first
+            start = max(0, end - count)
+            return self._records[start:max(0, end)][::-1]
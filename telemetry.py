@@ -0,0 +1,288 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Stages of a job, in pipeline order
+QUEUE = "queue"        # waiting for a scheduler slot
+EXTRACT = "extract"    # get_video_info / stream_info
+PREPARE = "prepare"    # format selection and connecting, until the first byte
+TRANSFER = "transfer"  # network transfer
+MERGE = "merge"        # ffmpeg merge of video+audio (inline)
+TRANSCODE = "transcode"  # waiting for the post-processing pool (audio conversion)
+STAGES = (QUEUE, EXTRACT, PREPARE, TRANSFER, MERGE, TRANSCODE)
+
+# Recent jobs kept for the summary panel
+RECENT_JOBS = 200
+# Jobs are kept in the JSON lines file this long (and at most MAX_FILE_JOBS of them)
+KEEP_SECONDS = 7 * 24 * 3600
+MAX_FILE_JOBS = 20000
+# The file is pruned on the first write and then every PRUNE_EVERY writes
+PRUNE_EVERY = 100
+
+
+class JobMetrics:
+    """Timings and transfer figures of one download_video call."""
+    __slots__ = ('url', 'host', 'started', 'finished', 'stages', 'bytes', 'peak_speed',
+                 'retries', 'success', 'error', 'first_byte', '_open', '_file_bytes', '_speeds', '_lock')
+
+    def __init__(self, url, host):
+        self.url = url
+        self.host = host
+        self.started = time.time()
+        self.finished = None
+        self.stages = {}  # stage -> seconds (summed over retries and playlist entries)
+        self.bytes = 0
+        self.peak_speed = 0
+        self.retries = 0
+        self.success = None
+        self.error = None
+        self.first_byte = None
+        self._open = {}  # stage -> monotonic start
+        self._file_bytes = {}
+        self._speeds = {}  # filename -> current speed, summed for parallel streams
+        self._lock = threading.RLock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+    def begin(self, stage):
+        with self._lock:
+            self._open.setdefault(stage, time.monotonic())
+
+    def end(self, stage):
+        with self._lock:
+            start = self._open.pop(stage, None)
+            if start is not None:
+                self.add(stage, time.monotonic() - start)
+
+    def begin_attempt(self):
+        self.begin(PREPARE)
+
+    def end_attempt(self):
+        with self._lock:
+            for stage in list(self._open):
+                self.end(stage)
+            self._speeds = {}
+
+    def progress_hook(self, d):
+        status = d.get('status')
+        filename = d.get('filename')
+        with self._lock:
+            if status == 'downloading':
+                if self.first_byte is None:
+                    self.first_byte = time.time()
+                if TRANSFER not in self._open:
+                    self.end(PREPARE)
+                    self.begin(TRANSFER)
+                self._file_bytes[filename] = d.get('downloaded_bytes') or 0
+                self._speeds[filename] = d.get('speed') or 0
+                self.peak_speed = max(self.peak_speed, sum(self._speeds.values()))
+            elif status == 'finished':
+                self._file_bytes[filename] = (d.get('total_bytes') or d.get('downloaded_bytes')
+                                              or self._file_bytes.get(filename, 0))
+                self._speeds.pop(filename, None)
+
+    def postprocessor_hook(self, d):
+        if d.get('postprocessor') != 'Merger':
+            return
+        if d.get('status') == 'started':
+            self.end(TRANSFER)
+            self.begin(MERGE)
+        elif d.get('status') == 'finished':
+            self.end(MERGE)
+
+    def close(self, success, error=None):
+        self.end_attempt()
+        self.finished = time.time()
+        self.success = success
+        self.error = None if success else error
+        self.bytes = sum(self._file_bytes.values())
+
+    def avg_speed(self):
+        transfer = self.stages.get(TRANSFER)
+        return self.bytes / transfer if transfer else 0
+
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'host': self.host,
+            'started': round(self.started, 3),
+            'duration': round((self.finished or time.time()) - self.started, 3),
+            'stages': {k: round(v, 3) for k, v in self.stages.items()},
+            'time_to_first_byte': round(self.first_byte - self.started, 3) if self.first_byte else None,
+            'bytes': self.bytes,
+            'avg_speed': round(self.avg_speed()),
+            'peak_speed': round(self.peak_speed),
+            'retries': self.retries,
+            'success': self.success,
+            'error': self.error,
+        }
+
+
+class Telemetry:
+    """
+    Collects JobMetrics: appends each finished job to a JSON lines file,
+    keeps totals for a Prometheus-style text export (optionally served over
+    HTTP) and recent jobs for the in-app summary.
+    """
+
+    def __init__(self, path=None, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.recent = deque(maxlen=RECENT_JOBS)
+        self._extract = OrderedDict()  # url -> seconds, picked up by the next job of that url
+        self._totals = {'jobs': 0, 'failed': 0, 'retries': 0, 'bytes': 0}
+        self._stage_totals = dict.fromkeys(STAGES, 0.0)
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._writes = 0
+
+    def add_listener(self, callback):
+        """callback(metrics_dict) after each finished job."""
+        self._listeners.append(callback)
+
+    def record_extract(self, url, seconds, cached=False):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._extract[url] = 0.0 if cached else seconds
+            while len(self._extract) > 1000:
+                self._extract.popitem(last=False)
+
+    def start_job(self, url, host="", queue_wait=None):
+        metrics = JobMetrics(url, host)
+        with self._lock:
+            extract = self._extract.pop(url, None)
+        if extract is not None:
+            metrics.add(EXTRACT, extract)
+        if queue_wait is not None:
+            metrics.add(QUEUE, queue_wait)
+        return metrics
+
+    def finish_job(self, metrics, success, error=None):
+        metrics.close(success, error)
+        if not self.enabled:
+            return
+        data = metrics.to_dict()
+        with self._lock:
+            self.recent.append(data)
+            self._totals['jobs'] += 1
+            self._totals['failed'] += 0 if success else 1
+            self._totals['retries'] += metrics.retries
+            self._totals['bytes'] += metrics.bytes
+            for stage, seconds in metrics.stages.items():
+                self._stage_totals[stage] = self._stage_totals.get(stage, 0) + seconds
+            if self.path:
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune_file()
+                self._writes += 1
+                try:
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(data, ensure_ascii=False) + "\n")
+                except OSError as e:
+                    print(f"Telemetry write error: {e}")
+        for callback in list(self._listeners):
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"Telemetry listener error: {e}")
+
+    def _prune_file(self, older_than=KEEP_SECONDS):
+        # Called with the lock held. Drops jobs older than the window, keeps the newest MAX_FILE_JOBS.
+        if not os.path.exists(self.path):
+            return
+        cutoff = time.time() - older_than
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+            kept = []
+            for line in lines:
+                try:
+                    if json.loads(line).get('started', 0) >= cutoff:
+                        kept.append(line)
+                except ValueError:
+                    continue
+            kept = kept[-MAX_FILE_JOBS:]
+            if len(kept) == len(lines):
+                return
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Telemetry prune error: {e}")
+
+    def summary(self):
+        """Figures for the summary panel, over the recent jobs."""
+        with self._lock:
+            jobs = list(self.recent)
+            totals = dict(self._totals)
+        done = [j for j in jobs if j['success']]
+        count = len(jobs) or 1
+
+        def mean(values):
+            values = [v for v in values if v is not None]
+            return sum(values) / len(values) if values else 0
+
+        return {
+            'jobs': totals['jobs'],
+            'failed': totals['failed'],
+            'retries': totals['retries'],
+            'bytes': totals['bytes'],
+            'success_rate': len(done) / count if jobs else None,
+            'avg_speed': mean([j['avg_speed'] for j in done]),
+            'peak_speed': max([j['peak_speed'] for j in jobs] or [0]),
+            'avg_time_to_first_byte': mean([j['time_to_first_byte'] for j in jobs]),
+            'avg_stages': {stage: mean([j['stages'].get(stage) for j in jobs]) for stage in STAGES},
+        }
+
+    def prometheus_text(self, gauges=None):
+        """Prometheus text exposition; gauges: extra {name: value} (e.g. scheduler stats)."""
+        with self._lock:
+            totals = dict(self._totals)
+            stage_totals = dict(self._stage_totals)
+        lines = [
+            "# TYPE downloader_jobs_total counter",
+            f"downloader_jobs_total {totals['jobs']}",
+            "# TYPE downloader_jobs_failed_total counter",
+            f"downloader_jobs_failed_total {totals['failed']}",
+            "# TYPE downloader_retries_total counter",
+            f"downloader_retries_total {totals['retries']}",
+            "# TYPE downloader_bytes_total counter",
+            f"downloader_bytes_total {totals['bytes']}",
+            "# TYPE downloader_stage_seconds_total counter",
+        ]
+        for stage in STAGES:
+            lines.append(f'downloader_stage_seconds_total{{stage="{stage}"}} {stage_totals.get(stage, 0):.3f}')
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE downloader_{name} gauge")
+            lines.append(f"downloader_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, gauges=None, host="127.0.0.1"):
+        """Serves prometheus_text() on http://host:port/metrics from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text(gauges() if gauges else None).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
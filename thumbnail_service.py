@@ -0,0 +1,141 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+THUMB_SIZE = (120, 68)
+
+
+class ThumbnailService:
+    """
+    Fetches thumbnails for task cards.
+    - one pooled HTTP session with timeouts, at most max_workers downloads at once
+    - JPEGs are decoded in draft mode straight to a reduced size
+    - downscaled images are kept in an in-memory LRU and on disk,
+      so the same video never hits the network twice
+    Callbacks run on a worker thread; GUI code must hop back to Tk with after().
+    requests and PIL are imported on the workers, never on the caller's thread.
+    """
+
+    def __init__(self, cache_dir, max_workers=4, memory_items=256, max_disk_files=2000, timeout=(5, 10)):
+        self.cache_dir = cache_dir
+        self.memory_items = memory_items
+        self.max_disk_files = max_disk_files
+        self.timeout = timeout
+        self.max_workers = max_workers
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.session = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumb")
+        self._memory = OrderedDict()
+        self._pending = {}  # key -> callbacks waiting for the same image
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    @staticmethod
+    def make_key(url, key=None):
+        return hashlib.sha1((key or url).encode('utf-8')).hexdigest()
+
+    def fetch(self, url, callback, key=None):
+        """
+        Calls callback(image or None) once the thumbnail is ready.
+        key: stable id for the image (e.g. extractor + video id), defaults to the URL.
+        """
+        cache_key = self.make_key(url, key)
+        with self._lock:
+            img = self._memory.get(cache_key)
+            if img is not None:
+                self._memory.move_to_end(cache_key)
+            elif cache_key in self._pending:
+                # Already being fetched for another card
+                self._pending[cache_key].append(callback)
+                return
+            else:
+                self._pending[cache_key] = [callback]
+        if img is not None:
+            callback(img)
+            return
+        self._executor.submit(self._load, url, cache_key)
+
+    def _get_session(self):
+        with self._lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.headers['User-Agent'] = 'Mozilla/5.0'
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.max_workers, max_retries=1)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self.session = session
+            return self.session
+
+    def _load(self, url, cache_key):
+        img = None
+        try:
+            img = self._load_from_disk(cache_key)
+            if img is None:
+                img = self._download(url)
+                if img is not None:
+                    self._save_to_disk(cache_key, img)
+        except Exception as e:
+            print(f"Thumbnail error: {e}")
+
+        with self._lock:
+            callbacks = self._pending.pop(cache_key, [])
+            if img is not None:
+                self._memory[cache_key] = img
+                while len(self._memory) > self.memory_items:
+                    self._memory.popitem(last=False)
+        for callback in callbacks:
+            try:
+                callback(img)
+            except Exception as e:
+                print(f"Thumbnail callback error: {e}")
+
+    def _disk_path(self, cache_key):
+        return os.path.join(self.cache_dir, cache_key + ".jpg")
+
+    def _load_from_disk(self, cache_key):
+        path = self._disk_path(cache_key)
+        if not os.path.exists(path):
+            return None
+        from PIL import Image
+        with Image.open(path) as img:
+            img.load()
+            return img.copy()
+
+    def _download(self, url):
+        from PIL import Image
+        response = self._get_session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        img = Image.open(io.BytesIO(response.content))
+        # JPEG: let the decoder skip work by decoding at 1/2, 1/4 or 1/8 scale
+        img.draft('RGB', (THUMB_SIZE[0] * 2, THUMB_SIZE[1] * 2))
+        img = img.convert('RGB')
+        img.thumbnail(THUMB_SIZE)
+        return img
+
+    def _save_to_disk(self, cache_key, img):
+        img.save(self._disk_path(cache_key), format='JPEG', quality=85)
+        self._writes += 1
+        if self._writes % 50 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        try:
+            files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir)]
+            if len(files) <= self.max_disk_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - self.max_disk_files]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Thumbnail cache prune error: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+        if self.session is not None:
+            self.session.close()
@@ -0,0 +1,147 @@
+import re
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+# Query parameters that only track where a link was shared from
+TRACKING_PARAMS = {
+    "si", "feature", "pp", "fbclid", "gclid", "igshid", "igsh",
+    "is_from_webapp", "sender_device", "share_app_id", "ab_channel",
+}
+
+YOUTUBE_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com"}
+YOUTUBE_ID_RE = re.compile(r"^[0-9A-Za-z_-]{11}$")
+
+
+def _strip_www(host):
+    return host[4:] if host.startswith("www.") else host
+
+
+def youtube_ids(url):
+    """Returns (video_id, playlist_id) for YouTube links, (None, None) otherwise."""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None, None
+    host = _strip_www((parsed.hostname or "").lower())
+    query = dict(parse_qsl(parsed.query))
+    playlist_id = query.get("list")
+    video_id = None
+
+    if host == "youtu.be":
+        video_id = parsed.path.strip("/").split("/")[0]
+    elif host in YOUTUBE_HOSTS:
+        parts = [p for p in parsed.path.split("/") if p]
+        if parts[:1] == ["watch"]:
+            video_id = query.get("v")
+        elif len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+            video_id = parts[1]
+        elif parts[:1] != ["playlist"]:
+            return None, None
+    else:
+        return None, None
+
+    if video_id and not YOUTUBE_ID_RE.match(video_id):
+        video_id = None
+    return video_id, playlist_id
+
+
+def normalize_url(url):
+    """
+    Canonical form of a link: YouTube variants become youtube:<id>
+    (or youtube:playlist:<id>), other links lose tracking params,
+    fragments and the www. prefix.
+    """
+    url = url.strip()
+    video_id, playlist_id = youtube_ids(url)
+    if playlist_id:
+        return f"youtube:playlist:{playlist_id}"
+    if video_id:
+        return f"youtube:{video_id}"
+
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return url
+    host = _strip_www((parsed.hostname or "").lower())
+    if parsed.port:
+        host = f"{host}:{parsed.port}"
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if k not in TRACKING_PARAMS and not k.startswith("utm_")]
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse(("https" if parsed.scheme in ("http", "https") else parsed.scheme,
+                       host, path, "", urlencode(sorted(query)), ""))
+
+
+# Links in free text: pasted lists, .txt files, CSV cells, chat messages...
+URL_RE = re.compile(r"""(?:https?://|www\.|youtu\.be/)[^\s"'<>,|\\]+""", re.I)
+TRAILING_PUNCTUATION = ".,;:!?)]}'\""
+
+
+def extract_urls(text):
+    """Every link in text, in order of appearance (duplicates included)."""
+    urls = []
+    for match in URL_RE.finditer(text or ""):
+        url = match.group(0).rstrip(TRAILING_PUNCTUATION)
+        if not url.lower().startswith("http"):
+            url = "https://" + url
+        urls.append(url)
+    return urls
+
+
+def _clean_query(query):
+    return [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+            if k not in TRACKING_PARAMS and not k.startswith("utm_")]
+
+
+def clean_url(url):
+    """
+    Downloadable form of a link: YouTube variants (youtu.be, shorts, m.,
+    music., embed) become a plain watch or playlist URL, other links only
+    lose tracking params and the fragment.
+    """
+    url = url.strip()
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return url
+    video_id, playlist_id = youtube_ids(url)
+    if video_id:
+        # A watch link keeps its list= (and start_radio, index...): Mix and
+        # radio lists (list=RD...) can only be extracted from the watch page
+        query = [(k, v) for k, v in _clean_query(parsed.query) if k != "v"]
+        return "https://www.youtube.com/watch?" + urlencode([("v", video_id)] + query)
+    if playlist_id:
+        return f"https://www.youtube.com/playlist?list={playlist_id}"
+    return urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params,
+                       urlencode(_clean_query(parsed.query)), ""))
+
+
+def unique_urls(urls, seen=None):
+    """
+    Cleans urls and drops repeats (same normalize_url key), also against
+    the keys already in seen, which is updated. Returns (new, duplicates).
+    """
+    seen = set() if seen is None else seen
+    new, duplicates = [], 0
+    for url in urls:
+        url = clean_url(url)
+        key = normalize_url(url)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        new.append(url)
+    return new, duplicates
+
+
+def read_url_file(path):
+    """Links in a .txt/.csv (or any text) file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    # Notepad saves "Unicode" as UTF-16 with a BOM
+    encodings = ("utf-16",) if data[:2] in (b"\xff\xfe", b"\xfe\xff") else ("utf-8-sig", "cp1252")
+    for encoding in encodings:
+        try:
+            return extract_urls(data.decode(encoding))
+        except UnicodeDecodeError:
+            continue
+    return extract_urls(data.decode("latin-1"))
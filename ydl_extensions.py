@@ -0,0 +1,149 @@
+"""
+yt-dlp subclasses used by the downloader. Imported lazily: it pulls in yt_dlp.
+"""
+import os
+import threading
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.postprocessor import get_postprocessor
+from yt_dlp.postprocessor.common import PostProcessor
+
+
+class ArchivePP(PostProcessor):
+    """Records the final file of each download in a DownloadArchive."""
+
+    def __init__(self, downloader, archive):
+        super().__init__(downloader)
+        self.archive = archive
+
+    def run(self, info):
+        try:
+            self.archive.record(info)
+        except Exception as e:
+            self.report_warning(f'Could not record {info.get("id")} in the archive: {e}')
+        return [], info
+
+
+class DeferredPP(PostProcessor):
+    """
+    Runs a yt-dlp postprocessor (given like an entry of the 'postprocessors'
+    option) on a PostProcessPool instead of the download thread.
+
+    The job's PostProcessBatch is taken from the 'postprocess_batch' param;
+    without one the postprocessor runs inline as usual. Each task returns
+    the info dict as left by the postprocessor (new filepath, ext).
+    The YoutubeDLPool keeps the instance leased until the batch is done, so
+    the task can use self._downloader after the download itself returned.
+    """
+
+    def __init__(self, downloader, pp_def):
+        super().__init__(downloader)
+        self.pp_def = dict(pp_def)
+
+    def _make(self):
+        pp_def = dict(self.pp_def)
+        return get_postprocessor(pp_def.pop('key'))(self._downloader, **pp_def)
+
+    def run(self, info):
+        batch = self._downloader.params.get('postprocess_batch')
+        if batch is None:
+            return [], self.process(info)
+        batch.submit(self.process, dict(info))
+        return [], info
+
+    def process(self, info):
+        pp = self._make()
+        files_to_delete, info = pp.run(info)
+        if not self.get_param('keepvideo'):
+            for path in files_to_delete:
+                if os.path.exists(path):
+                    os.remove(path)
+        return info
+
+
+class _StreamGroup:
+    """Streams of one merged format being downloaded side by side."""
+
+    def __init__(self, count):
+        self.remaining = count
+        self.threads = []
+        self.results = []
+        self.errors = []
+
+    def start(self, target):
+        def run():
+            try:
+                self.results.append(target())
+            except BaseException as e:
+                self.errors.append(e)
+        thread = threading.Thread(target=run, daemon=True)
+        self.threads.append(thread)
+        thread.start()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+        return self.results
+
+
+class PipelineYoutubeDL(YoutubeDL):
+    """
+    YoutubeDL whose merged formats (bestvideo+bestaudio) fetch all their
+    streams at the same time instead of one after the other. The merge
+    starts as soon as the last stream is complete.
+
+    Custom params (ignored by yt-dlp itself):
+      parallel_streams: True to enable the parallel fetch
+    Each stream's info dict gets `_stream_group` = (key, count, expected_bytes)
+    so progress hooks can report the streams as one download.
+    """
+
+    def _per_format_download(self, info_dict):
+        # yt-dlp calls dl() once per format only when no downloader takes the
+        # merged info as a whole (FFmpegFD, merge_mode='ffmpeg', fetches all at once)
+        if not (info_dict.get('protocol') or info_dict.get('url')):
+            return True
+        return get_suitable_downloader(info_dict, self.params) is None
+
+    def process_info(self, info_dict):
+        formats = info_dict.get('requested_formats') or []
+        if len(formats) > 1 and self._per_format_download(info_dict):
+            expected = sum(f.get('filesize') or f.get('filesize_approx') or 0 for f in formats)
+            self._stream_meta = (info_dict.get('id'), len(formats), expected)
+            if self.params.get('parallel_streams'):
+                self._stream_group = _StreamGroup(len(formats))
+        try:
+            return super().process_info(info_dict)
+        finally:
+            group = getattr(self, '_stream_group', None)
+            self._stream_group = None
+            self._stream_meta = None
+            if group:
+                # Never leave a stream running behind a failed job
+                for thread in group.threads:
+                    thread.join()
+
+    def dl(self, name, info, subtitle=False, test=False):
+        meta = getattr(self, '_stream_meta', None)
+        if subtitle or test or not meta:
+            return super().dl(name, info, subtitle=subtitle, test=test)
+        info = dict(info, _stream_group=meta)
+
+        group = getattr(self, '_stream_group', None)
+        if group is None:
+            return super().dl(name, info)
+        if group.remaining > 1:
+            # Not the last stream: start it and let process_info move on.
+            # The result is checked when the last stream is done.
+            group.remaining -= 1
+            group.start(lambda: YoutubeDL.dl(self, name, info))
+            return True, True
+
+        result = super().dl(name, info)
+        for success, _real_download in group.join():
+            if not success:
+                return False, result[1]
+        return result
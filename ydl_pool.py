@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Options that change from job to job. They are applied on every lease
+# instead of being part of the pool key. log_hooks is ours, not yt-dlp's:
+# callables getting (level, message) for warnings and errors.
+PER_JOB_KEYS = ('progress_hooks', 'postprocessor_hooks', 'outtmpl', 'playlist_items', 'log_hooks')
+# Params a job may change on its leased instance, restored on release
+JOB_TUNABLE_PARAMS = ('playlist_items', 'concurrent_fragment_downloads', 'postprocess_batch', 'ratelimit')
+
+_import_lock = threading.Lock()
+
+
+def load_yt_dlp():
+    """
+    Imports yt_dlp (heavy, only loaded when first needed) and returns it.
+    Its package init is not safe to run from two threads at once (one sees a
+    partially initialized yt_dlp.extractor), and workers, prefetch threads
+    and the GUI warm-up all import it lazily: every first use goes through here.
+    """
+    with _import_lock:
+        import yt_dlp
+        import yt_dlp.extractor
+        import yt_dlp.postprocessor
+        import yt_dlp.cookies
+    return yt_dlp
+
+
+class _LeaseLogger:
+    """yt-dlp logger forwarding warnings/errors to the current lease's log_hooks."""
+
+    def __init__(self, entry):
+        self.entry = entry
+
+    def debug(self, msg):
+        pass
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        self.entry.dispatch_log('warning', msg)
+
+    def error(self, msg):
+        self.entry.dispatch_log('error', msg)
+
+
+class PooledYoutubeDL:
+    """
+    A long-lived YoutubeDL plus the per-job state that is swapped on each lease.
+    Keeping the instance alive keeps its HTTP connections, loaded cookies
+    and initialized extractors between jobs.
+    """
+
+    def __init__(self, key, opts, setup=None, factory=None):
+        self.key = key
+        self.hooks = []
+        self.pp_hooks = []
+        self.log_hooks = []
+        params = {k: v for k, v in opts.items() if k not in PER_JOB_KEYS}
+        params['progress_hooks'] = [self._dispatch_progress]
+        params['postprocessor_hooks'] = [self._dispatch_postprocessor]
+        params['logger'] = _LeaseLogger(self)
+        if factory is None:
+            factory = load_yt_dlp().YoutubeDL
+        self.ydl = factory(params)
+        if setup:
+            setup(self.ydl)
+        self.default_outtmpl = self._outtmpl().get('default')
+        self.last_used = time.time()
+
+    def _outtmpl(self):
+        outtmpl = self.ydl.params.get('outtmpl')
+        if not isinstance(outtmpl, dict):
+            outtmpl = {'default': outtmpl} if outtmpl else {}
+            self.ydl.params['outtmpl'] = outtmpl
+        return outtmpl
+
+    def _dispatch_progress(self, d):
+        for hook in self.hooks:
+            hook(d)
+
+    def _dispatch_postprocessor(self, d):
+        for hook in self.pp_hooks:
+            hook(d)
+
+    def dispatch_log(self, level, msg):
+        for hook in self.log_hooks:
+            hook(level, msg)
+
+    def prepare(self, opts):
+        self.hooks = list(opts.get('progress_hooks') or [])
+        self.pp_hooks = list(opts.get('postprocessor_hooks') or [])
+        self.log_hooks = list(opts.get('log_hooks') or [])
+        self._outtmpl()['default'] = opts.get('outtmpl') or self.default_outtmpl
+        if opts.get('playlist_items'):
+            self.ydl.params['playlist_items'] = opts['playlist_items']
+        else:
+            self.ydl.params.pop('playlist_items', None)
+
+    def reset(self):
+        self.hooks = []
+        self.pp_hooks = []
+        self.log_hooks = []
+        for name in JOB_TUNABLE_PARAMS:
+            self.ydl.params.pop(name, None)
+        self.last_used = time.time()
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception as e:
+            print(f"Error closing YoutubeDL: {e}")
+
+
+class YoutubeDLPool:
+    """
+    Thread-safe pool of YoutubeDL instances keyed by their options.
+    Each instance is used by a single job at a time.
+    setup(ydl) is called once for every new instance (e.g. to add postprocessors).
+    factory(params) builds the instances, yt_dlp.YoutubeDL by default.
+    """
+
+    def __init__(self, max_idle_per_key=4, idle_timeout=300, setup=None, factory=None):
+        self.setup = setup
+        self.factory = factory
+        self.max_idle_per_key = max_idle_per_key
+        self.idle_timeout = idle_timeout
+        self._idle = {}  # key -> [PooledYoutubeDL]
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def make_key(opts):
+        shared = {k: v for k, v in opts.items() if k not in PER_JOB_KEYS}
+        return json.dumps(shared, sort_keys=True, default=repr)
+
+    @contextmanager
+    def lease(self, opts):
+        """
+        with pool.lease(ydl_opts) as ydl: ...
+        Instances that raised are closed instead of being returned. An instance
+        whose 'postprocess_batch' still has pending tasks is returned once they are done.
+        """
+        entry = self._acquire(opts)
+        ok = False
+        try:
+            yield entry.ydl
+            ok = True
+        finally:
+            self._release(entry, ok)
+
+    def _acquire(self, opts):
+        key = self.make_key(opts)
+        entry = None
+        expired = []
+        with self._lock:
+            now = time.time()
+            for k, entries in self._idle.items():
+                expired.extend(e for e in entries if now - e.last_used > self.idle_timeout)
+                entries[:] = [e for e in entries if now - e.last_used <= self.idle_timeout]
+            if self._idle.get(key):
+                entry = self._idle[key].pop()
+                self.reused += 1
+            else:
+                self.created += 1
+        for e in expired:
+            e.close()
+
+        if entry is None:
+            entry = PooledYoutubeDL(key, opts, setup=self.setup, factory=self.factory)
+        entry.prepare(opts)
+        return entry
+
+    def _release(self, entry, ok):
+        batch = entry.ydl.params.get('postprocess_batch')
+        if batch is not None and batch.pending():
+            # Deferred postprocessors (ydl_extensions.DeferredPP) still run on this
+            # instance: keep it, and the job's hooks, out of the pool until they finish
+            batch.when_done(lambda: self._return(entry, ok))
+            return
+        self._return(entry, ok)
+
+    def _return(self, entry, ok):
+        entry.reset()
+        if ok:
+            with self._lock:
+                entries = self._idle.setdefault(entry.key, [])
+                if len(entries) < self.max_idle_per_key:
+                    entries.append(entry)
+                    return
+        entry.close()
+
+    def stats(self):
+        with self._lock:
+            idle = sum(len(v) for v in self._idle.values())
+        return {'created': self.created, 'reused': self.reused, 'idle': idle}
+
+    def close_all(self):
+        with self._lock:
+            entries = [e for v in self._idle.values() for e in v]
+            self._idle = {}
+        for e in entries:
+            e.close()